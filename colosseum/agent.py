@@ -1,8 +1,10 @@
 import atexit
+import importlib
 import json
 import logging
 import os
 import os.path
+import re
 import shlex
 import shutil
 import socket
@@ -19,15 +21,36 @@ import requests
 from pexpect.popen_spawn import PopenSpawn
 from retrying import retry
 
-from colosseum.utils import get_internal_id
+from colosseum.utils import encode_message, get_internal_id
 
 
 DOCKER_AGENT_TIMEOUT = 30
 NATIVE_AGENT_TIMEOUT = 5
 
 DEFAULT_AGENT_CHANNEL = "STDIO"
+PYTHON_AGENT_CHANNEL = "PYTHON"
+UCI_AGENT_CHANNEL = "UCI"
 
-logging.basicConfig(level=logging.INFO)
+# Milliseconds taken off the step time limit when telling UCI engines how
+# long to think, to leave room for the engine to answer
+UCI_MOVE_OVERHEAD = 100
+
+IMPORT_PATH_RE = re.compile(r"^[\w.]+:\w+$")
+
+
+def is_import_path(agent_path):
+    return bool(IMPORT_PATH_RE.match(agent_path))
+
+
+def create_agent(agent_path, **kwargs):
+    """
+    Creates an in process agent if ``agent_path`` is an import path in the
+    ``module:Class`` format, or a regular agent otherwise.
+    """
+    if is_import_path(agent_path):
+        return InProcessAgent(agent_path, **kwargs)
+
+    return Agent(agent_path, **kwargs)
 
 
 class Agent:
@@ -59,24 +82,27 @@ class Agent:
 
         self._docker_agent_port = randint(1025, 65535)
 
+        # Moves played so far, for the position sent to UCI engines
+        self._uci_moves = []
+
     def start(self):
         # The log message is both helpful, and warms the cache too
-        self.logger.info(f"using agent_channel = {self.agent_channel}")
+        self.logger.info("using agent_channel = %s", self.agent_channel)
 
         self._child_process = self._boot_agent()
 
         response = self._exchange_message({"set_agent_id": self.id})
 
         if not response:
-            self.logger.warn(f"agent {self.id} failed to start")
+            self.logger.warning("agent %s failed to start", self.id)
             self._agent_started = False
-            self.logger.warn("This is an unrecoverable error")
+            self.logger.warning("This is an unrecoverable error")
             self._tainted = True
             self._tainted_reason = "STARTUP_FAIL"
             return
 
         if response.get("agent_id") != self.id or response.get("agent_id") is None:
-            self.logger.warning(f"agent failed to set id. got: {response}")
+            self.logger.warning("agent failed to set id. got: %s", response)
             self._set_agent_id = False
             self._log_error_count()
         else:
@@ -89,9 +115,9 @@ class Agent:
             self.version = response.get("agent_version")
 
         if self.name:
-            self.logger.info(f"agent name {self.name} {self.version}")
+            self.logger.info("agent name %s %s", self.name, self.version)
 
-        self.logger.info(f"agent {self.id} started")
+        self.logger.info("agent %s started", self.id)
         self._agent_started = True
 
     def ping(self):
@@ -104,7 +130,7 @@ class Agent:
         valid_ping = response.get("pong") is not None
         if not valid_ping:
             self.logger.warning(
-                f"agent {self.id} sent invalid response to ping: {response}"
+                "agent %s sent invalid response to ping: %s", self.id, response
             )
         self._successful_ping = valid_ping
         return valid_ping
@@ -118,9 +144,14 @@ class Agent:
     def stop(self, reason="end_of_game"):
         self._exchange_message({"stop": {"reason": reason}})
 
-    def update_state(self, state):
+    def update_state(self, state, encoded_state=None):
+        """
+        Sends the state to the agent. ``encoded_state`` can be given with the
+        already encoded payload, in which case it is sent as is instead of
+        encoding ``state`` again.
+        """
         self._tick()
-        self.__next_action = self._exchange_message(state)
+        self.__next_action = self._exchange_message(state, payload=encoded_state)
         self._tock()
 
     def get_actions(self):
@@ -133,7 +164,7 @@ class Agent:
 
         # Check if agent gave an agent_id
         if not agent_id:
-            self.logger.warning(f"agent {self.id} did not give an agent id")
+            self.logger.warning("agent %s did not give an agent id", self.id)
             self._tainted = True
             self._tainted_reason = "MISSING_AGENT_ID"
             return {}
@@ -142,13 +173,13 @@ class Agent:
         if agent_id != self.id:
             self._tainted = True
             self._tainted_reason = "AGENT_ID_SPOOFING"
-            self.logger.warning(f"agent {self.id} return invalid agent id")
+            self.logger.warning("agent %s return invalid agent id", self.id)
             return {}
 
         return actions
 
     def _log_error_count(self):
-        self.logger.warning(f"error_count: {self.error_count}")
+        self.logger.warning("error_count: %s", self.error_count)
 
     @property
     def agent_path(self):
@@ -162,11 +193,12 @@ class Agent:
         agent_folder = os.path.dirname(os.path.normpath(self.agent_path))
         manifest_path = os.path.join(agent_folder, "manifest.json")
 
-        self.logger.info(f"reading manifest from {manifest_path=}")
+        self.logger.info("reading manifest from manifest_path=%r", manifest_path)
 
         if not os.path.isfile(manifest_path):
             self.logger.info(
-                f"manifest file at {manifest_path=} does not exist. Assuming defaults"
+                "manifest file at manifest_path=%r does not exist. Assuming defaults",
+                manifest_path,
             )
             self._manifest = {}
             return self._manifest
@@ -177,9 +209,13 @@ class Agent:
         try:
             manifest = json.loads(manifest_raw)
             self._manifest = manifest
-            self.logger.info(f"manifest file at {manifest_path=} parsed successfully")
+            self.logger.info(
+                "manifest file at manifest_path=%r parsed successfully", manifest_path
+            )
         except Exception:
-            self.logger.info(f"failed to parsemanifest file at {manifest_path=}")
+            self.logger.info(
+                "failed to parsemanifest file at manifest_path=%r", manifest_path
+            )
 
         return self._manifest
 
@@ -187,6 +223,31 @@ class Agent:
     def agent_channel(self):
         return self.agent_manifest.get("channel", DEFAULT_AGENT_CHANNEL).upper()
 
+    @property
+    def state_exclude(self):
+        """
+        State keys the agent asked not to be sent, through ``state_exclude``
+        in its manifest. E.g. ``["grid"]`` for snake agents that only need
+        the snake and food positions.
+        """
+        return frozenset(self.agent_manifest.get("state_exclude", ()))
+
+    @property
+    def state_mode(self):
+        """
+        Either ``FULL``, the default, or ``INCREMENTAL`` for agents that asked
+        through ``state_mode`` in their manifest to only be sent what changed.
+        Games that don't support it send the full state anyway.
+        """
+        return self.agent_manifest.get("state_mode", "FULL").upper()
+
+    @property
+    def clock(self):
+        return {
+            "step_time_limit": self._step_time_limit,
+            "time_pool_left": self._overtime_pool,
+        }
+
     @property
     def error_count(self):
         return len(self._errors)
@@ -257,12 +318,21 @@ class Agent:
 
         if duration > self._step_time_limit:
             self.logger.warning(
-                f"agent {self.name} tick took {duration}. "
-                f"Limit is {self._step_time_limit}. "
-                f"Spent {duration - self._step_time_limit}. "
-                f"Time pool remaining {self._overtime_pool}"
+                "agent %s tick took %s. Limit is %s. Spent %s. Time pool remaining %s",
+                self.name,
+                duration,
+                self._step_time_limit,
+                duration - self._step_time_limit,
+                self._overtime_pool,
             )
 
+    @property
+    def last_step_duration(self):
+        if not self._step_durations:
+            return None
+
+        return self._step_durations[-1]
+
     @property
     def _overtime_pool(self):
         times_above_limit = [
@@ -275,19 +345,92 @@ class Agent:
 
     def _step_duration_check(self):
         if self._overtime_pool < 0:
-            self.logger.warning(f"agent is overtime by {self._overtime_pool}")
+            self.logger.warning("agent is overtime by %s", self._overtime_pool)
             self._overtime = True
 
-    def _exchange_message(self, message):
+    def _exchange_message(self, message, payload=None):
         if not self.agent_channel or self.agent_channel == "STDIO":
-            return self._exchange_stdio_message(message)
+            return self._exchange_stdio_message(message, payload=payload)
 
-        return self._exchange_http_message(message)
+        if self.agent_channel == UCI_AGENT_CHANNEL:
+            return self._exchange_uci_message(message)
 
-    def _exchange_stdio_message(self, message):
+        return self._exchange_http_message(message, payload=payload)
+
+    def _exchange_uci_message(self, message):
         try:
-            payload = json.dumps(message)
-            self.logger.debug(f"{payload=}")
+            return self._handle_uci_message(self._child_process, message)
+        except Exception as e:
+            self._errors.append(
+                {
+                    "error": "failed to talk to uci engine",
+                    "payload": message,
+                    "exception": e.__str__(),
+                }
+            )
+            self._log_error_count()
+            return None
+
+    def _handle_uci_message(self, engine, message):
+        """
+        Translates the messages sent to agents into the UCI protocol, so that
+        chess engines can play as they are. Only the ``move`` action is
+        answered, from the engine's ``bestmove``.
+        """
+        if "set_agent_id" in message:
+            engine.sendline("uci")
+            engine.expect(b"uciok")
+            name = re.search(rb"^id name (.+?)\r?$", engine.before, re.MULTILINE)
+
+            return {
+                "agent_id": self.id,
+                "agent_name": name and name.group(1).decode(),
+            }
+
+        if "ping" in message:
+            self._uci_is_ready(engine)
+            return {"agent_id": self.id, "pong": "pong"}
+
+        if "config" in message:
+            self._uci_moves = []
+            engine.sendline("ucinewgame")
+            self._uci_is_ready(engine)
+            return {"agent_id": self.id}
+
+        if "stop" in message:
+            engine.sendline("quit")
+            return {"agent_id": self.id}
+
+        # Agents get a state only on their turn, so the last move is always
+        # the opponent's, or there is none when playing the first move
+        if last_move := message.get("last_move"):
+            self._uci_moves.append(last_move)
+
+        position = "position startpos"
+        if self._uci_moves:
+            position += " moves " + " ".join(self._uci_moves)
+
+        movetime = max(1, int(self._step_time_limit * 1000) - UCI_MOVE_OVERHEAD)
+        engine.sendline(position)
+        engine.sendline(f"go movetime {movetime}")
+        engine.expect(
+            rb"bestmove (\S+)", timeout=self._step_time_limit + NATIVE_AGENT_TIMEOUT
+        )
+
+        move = engine.match.group(1).decode()
+        self._uci_moves.append(move)
+
+        return {"agent_id": self.id, "move": move}
+
+    def _uci_is_ready(self, engine):
+        engine.sendline("isready")
+        engine.expect(b"readyok")
+
+    def _exchange_stdio_message(self, message, payload=None):
+        try:
+            if payload is None:
+                payload = encode_message(message)
+            self.logger.debug("payload=%r", payload)
             self._child_process.sendline(payload)
         except Exception as e:
             self._errors.append(
@@ -303,12 +446,12 @@ class Agent:
 
         try:
             response_str = self._child_process.readline()
-            self.logger.debug(f"{response_str=}")
+            self.logger.debug("response_str=%r", response_str)
             response = json.loads(response_str)
             return response
         except json.JSONDecodeError as e:
             self.logger.info(
-                f"failed to parse agent actions. Got invalid json payload. Error: {e}"
+                "failed to parse agent actions. Got invalid json payload. Error: %s", e
             )
             self.logger.info("agent said:")
 
@@ -338,7 +481,7 @@ class Agent:
             if not hasattr(self, "response_str"):
                 response_str = "NOT_SET"
             else:
-                self.logger.info(f"agent said: {response_str}")
+                self.logger.info("agent said: %s", response_str)
 
             self._errors.append(
                 {
@@ -352,26 +495,37 @@ class Agent:
         else:
             return response
 
-    def _exchange_http_message(self, message):
+    def _exchange_http_message(self, message, payload=None):
+        if payload is None:
+            payload = encode_message(message)
+
         @retry(wait_exponential_multiplier=10, wait_exponential_max=5000)
-        def _exchange_data(data, port=None):
-            self.logger.debug(f"post to http://localhost:{port}")
-            self.logger.debug(f"data = {json.dumps(data)}")
-            response = requests.post(f"http://localhost:{port}", json=data)
+        def _exchange_data(payload, port=None):
+            self.logger.debug("post to http://localhost:%s", port)
+            self.logger.debug("payload=%r", payload)
+            response = requests.post(
+                f"http://localhost:{port}",
+                data=payload,
+                headers={"Content-Type": "application/json"},
+            )
             data_back = response.content.decode()
 
-            self.logger.debug(f"got from bot: {data_back}")
+            self.logger.debug("got from bot: %s", data_back)
 
             try:
                 return json.loads(data_back)
             except json.JSONDecodeError:
-                self.logger.warning(f"got invalid payload from bot: {data_back}")
+                self.logger.warning("got invalid payload from bot: %s", data_back)
                 return {}
 
-        return _exchange_data(message, port=self._docker_agent_port)
+        return _exchange_data(payload, port=self._docker_agent_port)
 
     def _boot_agent(self):
         try:
+            # Chess engine, or anything else speaking UCI
+            if self.agent_channel == UCI_AGENT_CHANNEL:
+                return PopenSpawn([self._agent_path], timeout=NATIVE_AGENT_TIMEOUT)
+
             # Pure python agent
             if "agent.py" in self.agent_path:
                 return PopenSpawn([self._agent_path], timeout=NATIVE_AGENT_TIMEOUT)
@@ -395,3 +549,80 @@ class Agent:
                 f"somethid went very wrong with agent at {self._agent_path}: {e}!"
             )
             return PopenSpawn(["./dummy.sh"], timeout=NATIVE_AGENT_TIMEOUT)
+
+
+class InProcessAgent(Agent):
+    """
+    Agent that runs inside the engine process, with no subprocess, pipes or
+    json in between. ``agent_path`` is an import path like ``module:Class``.
+    The class is instantiated without arguments, and its ``step(state)``
+    method gets called with every state and must return the actions. These
+    are either a dict with the game specific keys (e.g. ``move``) or a list,
+    which is sent as ``actions``. The ``agent_id`` is filled in.
+
+    Optionally the class can have ``name`` and ``version`` attributes, and
+    ``set_config(config)`` and ``stop(reason)`` methods.
+
+    The state is shared with the other agents and the replay, so it must be
+    treated as read only. Timing, errors and tainting work just like for
+    other agents.
+    """
+
+    @property
+    def agent_manifest(self):
+        return {"channel": PYTHON_AGENT_CHANNEL}
+
+    def _boot_agent(self):
+        # The instance takes the place of the child process
+        module_name, _, class_name = self.agent_path.partition(":")
+
+        try:
+            module = importlib.import_module(module_name)
+            return getattr(module, class_name)()
+        except Exception as e:
+            self.logger.warning("failed to load agent from %s: %s", self.agent_path, e)
+            return None
+
+    def _exchange_message(self, message, payload=None):
+        if self._child_process is None:
+            return None
+
+        try:
+            return self._handle_message(self._child_process, message)
+        except Exception as e:
+            self._errors.append(
+                {
+                    "error": "agent raised an exception",
+                    "payload": None,
+                    "exception": e.__str__(),
+                }
+            )
+            self._log_error_count()
+            return None
+
+    def _handle_message(self, bot, message):
+        if "set_agent_id" in message:
+            return {
+                "agent_id": self.id,
+                "agent_name": getattr(bot, "name", None),
+                "agent_version": getattr(bot, "version", None),
+            }
+
+        if "ping" in message:
+            return {"agent_id": self.id, "pong": "pong"}
+
+        if "config" in message:
+            if hasattr(bot, "set_config"):
+                bot.set_config(message["config"])
+            return {"agent_id": self.id}
+
+        if "stop" in message:
+            if hasattr(bot, "stop"):
+                bot.stop(message["stop"]["reason"])
+            return {"agent_id": self.id}
+
+        actions = bot.step(message)
+        if isinstance(actions, list):
+            actions = {"actions": actions}
+
+        return {**actions, "agent_id": self.id}
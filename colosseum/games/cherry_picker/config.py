@@ -16,6 +16,10 @@ class Config:
     base_spawn_border_offset = 0.15
     n_epochs = 10000
 
+    # When set, agents only see their own entities and what is within this
+    # distance of them
+    view_radius = None
+
     # Actor Settings
     actor_speed = 1
     actor_damage = 5
@@ -5,9 +5,18 @@ from ..game import BaseGame
 from .config import Config
 
 
+logger = logging.getLogger(__name__)
+
+
 class Game(BaseGame):
-    def __init__(self):
-        self._config = Config
+    # Agents never see each other's worlds, so each can be played on its own
+    supports_pipelines = True
+
+    def __init__(self, config=None):
+        if not config:
+            config = Config
+
+        self._config = config
 
         self._tick = 0
         self._n_epochs = self._config.n_epochs
@@ -25,6 +34,11 @@ class Game(BaseGame):
 
     @property
     def finished(self):
+        if self.agent_worlds and all(
+            self.agent_finished(agent_id) for agent_id in self.agent_worlds
+        ):
+            return True
+
         return self._tick >= self._n_epochs
 
     @property
@@ -53,10 +67,40 @@ class Game(BaseGame):
     def state(self):
         return {
             "state_by_agent": {
-                agent_id: world.state for agent_id, world in self.agent_worlds.items()
+                agent_id: self.agent_state(agent_id) for agent_id in self.agent_worlds
             }
         }
 
+    def agent_state(self, agent_id):
+        state = self.agent_worlds[agent_id].state
+        views = state.pop("state_by_agent", None)
+
+        return state if views is None else views[agent_id]
+
+    def update_agent(self, agent_id, agent_action):
+        # The world ticks even if the action is invalid, so that every world
+        # gets to the end
+        self.agent_worlds[agent_id].update([agent_action])
+
+    def agent_finished(self, agent_id):
+        return self.agent_worlds[agent_id].finished
+
+    def _copy_state(self, state):
+        return {
+            **state,
+            "agent_ids": set(state["agent_ids"]),
+            "agent_worlds": {
+                agent_id: world._detached_copy()
+                for agent_id, world in state["agent_worlds"].items()
+            },
+        }
+
+    def _attach_agents(self, agents):
+        super()._attach_agents(agents)
+
+        for agent in agents:
+            self.agent_worlds[agent.id]._attach_agents([agent])
+
     def update(self, agent_actions):
         self._tick += 1
 
@@ -66,7 +110,7 @@ class Game(BaseGame):
     def _process_agent_actions(self, agent_action):
         owner_id = agent_action.get("agent_id")
         if owner_id not in self.agent_ids:
-            logging.warning(f"agent with id {owner_id} is not registered. Ignoring")
+            logger.warning("agent with id %s is not registered. Ignoring", owner_id)
             return
 
         self.agent_worlds[owner_id].update([agent_action])
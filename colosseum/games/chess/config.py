@@ -4,6 +4,23 @@ class Config:
 
     n_epochs = -1  # Not used for chess
 
+    # Replays are written as PGN, see ``replay.PgnReplayWriter``
+    replay_format = "PGN"
+
+    # Adjudication ends games that are already decided, instead of playing on
+    # until checkmate or the 75 move rule. None disables a rule.
+    # Draw after this many plies without captures or pawn moves, as in the 50
+    # move rule, unless one side is ahead by the material threshold below
+    adjudication_quiet_plies = 100
+    # Win for a side that is this many pawns ahead in material, counting
+    # knights and bishops as 3, rooks as 5 and queens as 9, for this many
+    # plies in a row. Only if it has enough material left to mate.
+    adjudication_material_threshold = 5
+    adjudication_material_plies = 12
+    # Draw when there are no pawns, rooks or queens left and neither side has
+    # more than one minor piece, as nobody can force a mate then
+    adjudication_insufficient_material = True
+
     # Time settings
     step_time_limit = 2  # seconds
     step_limit_pool = 20
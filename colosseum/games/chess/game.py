@@ -11,22 +11,42 @@ from ..game import BaseGame
 from .config import Config
 
 
+logger = logging.getLogger(__name__)
+
+
 # FIXME: We need to figure out what to call it. Probably should be ``game'',
 # but the other game calls it ``World''.
 class Game(BaseGame):
-    def __init__(self):
+    def __init__(self, config=None):
+        if not config:
+            config = Config
+
         self.agents = set()
         self.agent_ids = set()
         self.agent_color = {}
         self.agent_by_color = {}
         self._colors_left = ["WHITE", "BLACK"]
+        # Agents that get the full position only on their first turn, and
+        # then just the last move. See ``_incremental_state``.
+        self._incremental_agent_ids = set()
+        self._legal_moves_requested = set()
 
-        self._config = Config
+        self._config = config
         self.name = self._config.game_name
         self._board = chess.Board()
         self._turn = "WHITE"
 
-        logging.info("chess initialized")
+        # Things derived from the board that get asked for many times every
+        # ply, like the outcome. They are kept until a move is pushed.
+        self._ply_cache = {}
+        self._ply_cache_key = 0
+
+        # Side ahead in material by at least the adjudication threshold, and
+        # for how many plies in a row
+        self._material_leader = None
+        self._material_lead_plies = 0
+
+        logger.info("chess initialized")
 
     def register_agent(self, agent):
         super().register_agent(agent)
@@ -38,19 +58,161 @@ class Game(BaseGame):
         self.agent_color[agent.id] = agent_color
         self.agent_by_color[agent_color] = agent.id
 
-        logging.info(f"agent {agent.id} registered as {agent_color}")
+        if agent.state_mode == "INCREMENTAL":
+            self._incremental_agent_ids.add(agent.id)
+
+        logger.info("agent %s registered as %s", agent.id, agent_color)
 
     @property
     def state(self):
-        legal_moves = [str(m) for m in self._legal_moves]
+        if not self._incremental_agent_ids:
+            return self._full_state
+
+        # The position and legal moves are the costly part, and incremental
+        # agents past their first turn don't read them
+        if self.full_state_needed or self._incremental_agent_ids < self.agent_ids:
+            state = self._full_state
+        else:
+            state = {"turn": self._board.turn, "last_move": self._last_move_uci}
+
+        state["state_by_agent"] = {
+            agent_id: (
+                self._incremental_state(agent_id)
+                if agent_id in self._incremental_agent_ids
+                else self._full_state
+            )
+            for agent_id in self.agent_ids
+        }
+
+        return state
+
+    @property
+    def _full_state(self):
         return {
-            "fen": self._board.fen(),
-            "epd": self._board.epd(),
+            "fen": self._cached("fen", self._board.fen),
+            "epd": self._cached("epd", self._board.epd),
             "turn": self._board.turn,
-            "legal_moves": legal_moves,
+            "legal_moves": self._legal_move_list,
             "last_move": self._last_move_uci,
         }
 
+    def _incremental_state(self, agent_id):
+        # Agents only get states on their turn, so by the second one they
+        # have seen every move but the one their opponent just made
+        if len(self._board.move_stack) < 2:
+            state = self._full_state
+        else:
+            state = {"turn": self._board.turn, "last_move": self._last_move_uci}
+
+            if agent_id in self._legal_moves_requested:
+                state["legal_moves"] = self._legal_move_list
+
+        state["clock"] = self._get_agent(agent_id).clock
+
+        return state
+
+    def _cached(self, key, compute):
+        # The move stack only grows while playing, so its length tells plies
+        # apart. Anything that replaces the board also resets the cache.
+        ply = len(self._board.move_stack)
+        if ply != self._ply_cache_key:
+            self._ply_cache = {}
+            self._ply_cache_key = ply
+
+        if key not in self._ply_cache:
+            self._ply_cache[key] = compute()
+
+        return self._ply_cache[key]
+
+    @property
+    def _outcome(self):
+        return self._cached("outcome", self._board.outcome)
+
+    @property
+    def _adjudication(self):
+        return self._cached("adjudication", self._adjudicate)
+
+    @property
+    def _decided_result(self):
+        # The result when the game ended by itself, and not by a tainted agent
+        if outcome := self._outcome:
+            return outcome.result()
+
+        if adjudication := self._adjudication:
+            return adjudication["result"]
+
+    def _adjudicate(self):
+        config = self._config
+
+        if config.adjudication_insufficient_material and self._only_minor_pieces:
+            return {"reason": "INSUFFICIENT_MATERIAL", "result": "1/2-1/2"}
+
+        if (
+            config.adjudication_material_plies is not None
+            and self._material_lead_plies >= config.adjudication_material_plies
+            and not self._board.has_insufficient_material(self._material_leader)
+        ):
+            result = "1-0" if self._material_leader == chess.WHITE else "0-1"
+            return {"reason": "MATERIAL", "result": result}
+
+        if (
+            config.adjudication_quiet_plies is not None
+            and self._board.halfmove_clock >= config.adjudication_quiet_plies
+            and not self._has_decisive_lead
+        ):
+            return {"reason": "QUIET_PLIES", "result": "1/2-1/2"}
+
+        return None
+
+    @property
+    def _has_decisive_lead(self):
+        # Whether one side is ahead by the material threshold and can mate,
+        # right now, however long it has been
+        threshold = self._config.adjudication_material_threshold
+        if threshold is None:
+            return False
+
+        balance = self._material(chess.WHITE) - self._material(chess.BLACK)
+        if abs(balance) < threshold:
+            return False
+
+        leader = chess.WHITE if balance > 0 else chess.BLACK
+        return not self._board.has_insufficient_material(leader)
+
+    @property
+    def _only_minor_pieces(self):
+        board = self._board
+        if board.pawns or board.rooks or board.queens:
+            return False
+
+        minor_pieces = board.knights | board.bishops
+        return all(
+            chess.popcount(board.occupied_co[color] & minor_pieces) <= 1
+            for color in chess.COLORS
+        )
+
+    def _material(self, color):
+        return sum(
+            chess.popcount(self._board.pieces_mask(piece_type, color)) * value
+            for piece_type, value in _PIECE_VALUES.items()
+        )
+
+    def _update_material_lead(self):
+        threshold = self._config.adjudication_material_threshold
+        balance = self._material(chess.WHITE) - self._material(chess.BLACK)
+
+        if threshold is None or abs(balance) < threshold:
+            self._material_leader = None
+            self._material_lead_plies = 0
+            return
+
+        leader = chess.WHITE if balance > 0 else chess.BLACK
+        if leader != self._material_leader:
+            self._material_leader = leader
+            self._material_lead_plies = 0
+
+        self._material_lead_plies += 1
+
     @property
     def outcome(self):
         outcome = {
@@ -59,6 +221,9 @@ class Game(BaseGame):
             "result": self._result,
         }
 
+        if not self._outcome and (adjudication := self._adjudication):
+            outcome["adjudication_reason"] = adjudication["reason"]
+
         if tainted_reason := self._tainted_reason:
             outcome["tainted_reason"] = tainted_reason
 
@@ -66,9 +231,12 @@ class Game(BaseGame):
 
     @property
     def _termination(self):
-        if outcome := self._board.outcome():
+        if outcome := self._outcome:
             return outcome.termination.__str__().split(".")[-1]
 
+        if self._adjudication:
+            return "ADJUDICATION"
+
         return "TAINTED"
 
     @property
@@ -85,8 +253,8 @@ class Game(BaseGame):
 
     @property
     def _result(self):
-        if outcome := self._board.outcome():
-            return outcome.result()
+        if result := self._decided_result:
+            return result
 
         # Otherwise an agent got tainted
         white_agent = self._get_agent(self.agent_by_color["WHITE"])
@@ -102,9 +270,9 @@ class Game(BaseGame):
 
     @property
     def _winner_color(self):
-        if self._board.outcome():
-            # If here is an outcome then the game ended due to a chess rule
-            result = self._board.outcome().result()
+        if self._decided_result:
+            # The game ended due to a chess or adjudication rule
+            result = self._decided_result
             white, black = result.split("-")
             try:
                 if int(white) == 1:
@@ -159,13 +327,23 @@ class Game(BaseGame):
     def _legal_moves(self):
         return self._board.legal_moves
 
+    @property
+    def _legal_move_list(self):
+        return self._cached(
+            "legal_move_list", lambda: [move.uci() for move in self._legal_moves]
+        )
+
+    @property
+    def _legal_move_set(self):
+        return self._cached("legal_move_set", lambda: set(self._legal_move_list))
+
     @property
     def scores(self):
         data = {}
 
-        if self._board.outcome():
-            # If here is an outcome then the game ended due to a chess rule
-            result = self._board.outcome().result()
+        if self._decided_result:
+            # The game ended due to a chess or adjudication rule
+            result = self._decided_result
             white, black = result.split("-")
         else:
             # Otherwise an agent got tainted
@@ -197,6 +375,20 @@ class Game(BaseGame):
 
         return data
 
+    def _copy_state(self, state):
+        return {
+            **state,
+            "agent_ids": set(state["agent_ids"]),
+            "agent_color": dict(state["agent_color"]),
+            "agent_by_color": dict(state["agent_by_color"]),
+            "_colors_left": list(state["_colors_left"]),
+            "_incremental_agent_ids": set(state["_incremental_agent_ids"]),
+            "_legal_moves_requested": set(state["_legal_moves_requested"]),
+            "_board": state["_board"].copy(),
+            "_ply_cache": {},
+            "_ply_cache_key": 0,
+        }
+
     def update(self, agent_actions):
         for agent_action in agent_actions:
             self.process_agent_actions(agent_action)
@@ -208,7 +400,7 @@ class Game(BaseGame):
 
     @property
     def finished(self):
-        if self._board.outcome():
+        if self._decided_result:
             return True
         return False
 
@@ -222,9 +414,34 @@ class Game(BaseGame):
         assert move_str
 
         move = chess.Move.from_uci(move_str)
+        # Moves nearly always come as listed in the state. The others, like
+        # castling written as the king taking its rook, go to python-chess.
         # FIXME: We should handle this gracefully
-        assert move in self._legal_moves
+        assert move_str in self._legal_move_set or move in self._legal_moves
+        self._push(move)
+
+        # Incremental agents can ask for the legal moves on their next turn
+        agent_id = agent_action.get("agent_id")
+        if agent_action.get("legal_moves"):
+            self._legal_moves_requested.add(agent_id)
+        else:
+            self._legal_moves_requested.discard(agent_id)
+
+    def _push(self, move):
         self._board.push(move)
+        self._ply_cache = {}
+        self._ply_cache_key = len(self._board.move_stack)
+
+        self._update_material_lead()
 
     def assign_agent_colors(self):
         assert len(self.agents) == 2
+
+
+_PIECE_VALUES = {
+    chess.PAWN: 1,
+    chess.KNIGHT: 3,
+    chess.BISHOP: 3,
+    chess.ROOK: 5,
+    chess.QUEEN: 9,
+}
@@ -0,0 +1,111 @@
+import io
+import json
+from datetime import datetime
+
+import chess
+import chess.pgn
+
+from colosseum.utils import encode_message
+
+
+class PgnReplayWriter:
+    """
+    Writes chess replays as PGN, which takes a few hundred bytes for a whole
+    game instead of a json line per ply. The time each move took is kept in
+    ``[%emt]`` comments, and the game config and agent ids in tags, so that
+    ``expand_pgn_replay`` can rebuild the json lines the renderer reads.
+    """
+
+    extension = "pgn"
+    # Moves are all the PGN keeps, and they come from the agent actions
+    needs_world_state = False
+
+    def __init__(self, filename, world, agents):
+        self.filename = filename
+        self._world = world
+        self._agents = {agent.id: agent for agent in agents}
+        self._agent_ids = [agent.id for agent in agents]
+
+        self._pgn = chess.pgn.Game()
+        self._node = self._pgn
+        self._board = chess.Board()
+
+    def write(self, epoch, world_state, agent_actions, encoded_state=None):
+        for agent_action in agent_actions:
+            if not agent_action.get("move"):
+                continue
+
+            move = self._board.parse_uci(agent_action["move"])
+            self._board.push(move)
+            self._node = self._node.add_main_variation(move)
+
+            agent = self._agents.get(agent_action.get("agent_id"))
+            if agent and agent.last_step_duration is not None:
+                self._node.set_emt(agent.last_step_duration)
+
+    def close(self):
+        outcome = self._world.outcome
+        headers = self._pgn.headers
+
+        headers["Event"] = self._world.config["game_name"]
+        headers["Site"] = "colosseum"
+        headers["Date"] = datetime.now().strftime("%Y.%m.%d")
+        headers["Result"] = outcome["result"] or "*"
+        headers["Termination"] = outcome["termination"]
+
+        for color in ["WHITE", "BLACK"]:
+            agent = self._agents[self._world.agent_by_color[color]]
+            headers[color.title()] = agent.name or agent.id
+            headers[f"{color.title()}AgentId"] = agent.id
+
+        headers["AgentIds"] = ",".join(self._agent_ids)
+        headers["GameConfig"] = json.dumps(self._world.config)
+
+        with open(self.filename, "wt") as f:
+            print(self._pgn, file=f, end="\n\n")
+
+
+def expand_pgn_replay(pgn):
+    """
+    Returns the json lines of the replay a ``PgnReplayWriter`` wrote, as they
+    would have been written by the default replay writer. Agent actions only
+    keep the move.
+    """
+    game = chess.pgn.read_game(io.StringIO(pgn))
+    headers = game.headers
+
+    game_config = json.loads(headers["GameConfig"])
+    agent_ids = headers["AgentIds"].split(",")
+    agent_by_color = {
+        chess.WHITE: headers["WhiteAgentId"],
+        chess.BLACK: headers["BlackAgentId"],
+    }
+
+    board = game.board()
+    lines = []
+
+    for epoch, move in enumerate(game.mainline_moves(), start=1):
+        world_state = {
+            "fen": board.fen(),
+            "epd": board.epd(),
+            "turn": board.turn,
+            "legal_moves": [legal_move.uci() for legal_move in board.legal_moves],
+            "last_move": board.peek().uci() if board.move_stack else None,
+            "epoch": epoch,
+            "agent_ids": agent_ids,
+        }
+        data = {
+            "game_config": game_config,
+            "epoch": epoch,
+            "max_epoch": game_config["n_epochs"],
+            "agent_actions": [
+                {"agent_id": agent_by_color[board.turn], "move": move.uci()}
+            ],
+            "agent_ids": agent_ids,
+            "world_state": world_state,
+        }
+        lines.append(encode_message(data) + b"\n")
+
+        board.push(move)
+
+    return b"".join(lines)
@@ -0,0 +1,194 @@
+import itertools
+import random
+
+import chess
+import pytest
+
+from ...vec_game import Seat
+from ..config import Config
+from ..game import Game
+
+
+class NoAdjudicationConfig(Config):
+    adjudication_quiet_plies = None
+    adjudication_material_threshold = None
+    adjudication_material_plies = None
+    adjudication_insufficient_material = False
+
+
+def _make_game(config=None, fen=None):
+    game = Game(config=config)
+    for agent_id in ["foo", "bar"]:
+        game.register_agent(Seat(agent_id))
+
+    game.agent_color = {"foo": "WHITE", "bar": "BLACK"}
+    game.agent_by_color = {"WHITE": "foo", "BLACK": "bar"}
+
+    if fen:
+        game._board = chess.Board(fen)
+
+    return game
+
+
+def _play(game, *moves):
+    for move in moves:
+        game.update([{"agent_id": game.agent_to_move, "move": move}])
+
+
+def test_state_follows_the_board():
+    random.seed(1)
+    game = _make_game(config=NoAdjudicationConfig)
+
+    while not game.finished:
+        state = game.state
+        board = game._board
+
+        assert state["fen"] == board.fen()
+        assert state["epd"] == board.epd()
+        assert state["legal_moves"] == [move.uci() for move in board.legal_moves]
+        assert game.finished == (board.outcome() is not None)
+
+        move = random.choice(state["legal_moves"])
+        game.update([{"agent_id": game.agent_to_move, "move": move}])
+
+    assert game.outcome["result"] == game._board.outcome().result()
+
+
+def test_outcome_is_computed_once_per_ply(monkeypatch):
+    game = _make_game()
+    calls = []
+
+    outcome = game._board.outcome
+    monkeypatch.setattr(game._board, "outcome", lambda: calls.append(1) or outcome())
+
+    for _ in range(3):
+        game.finished
+        game.outcome
+    assert len(calls) == 1
+
+    game.update([{"agent_id": game.agent_to_move, "move": "e2e4"}])
+    game.finished
+    assert len(calls) == 2
+
+
+def test_castling_as_king_takes_rook():
+    game = _make_game()
+    game._board = chess.Board("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1")
+
+    game.update([{"agent_id": game.agent_to_move, "move": "e1h1"}])
+
+    assert game.state["last_move"] == "e1g1"
+
+
+def test_incremental_state():
+    game = Game()
+    agent = Seat("foo")
+    agent.state_mode = "INCREMENTAL"
+    agent.clock = {"step_time_limit": 2, "time_pool_left": 20}
+    for player in [agent, Seat("bar")]:
+        game.register_agent(player)
+
+    # Plays white, so that it is its turn again after every pair of moves
+    game.agent_color = {"foo": "WHITE", "bar": "BLACK"}
+    game.agent_by_color = {"WHITE": "foo", "BLACK": "bar"}
+
+    # The first position is sent in full
+    state = game.state["state_by_agent"]["foo"]
+    assert state["fen"] == game._board.fen()
+    assert state["clock"] == agent.clock
+
+    game.update([{"agent_id": game.agent_to_move, "move": "e2e4"}])
+    game.update([{"agent_id": game.agent_to_move, "move": "e7e5"}])
+
+    states = game.state["state_by_agent"]
+    assert states["bar"] == {
+        k: v for k, v in game.state.items() if k != "state_by_agent"
+    }
+    assert states["foo"] == {
+        "turn": game._board.turn,
+        "last_move": "e7e5",
+        "clock": agent.clock,
+    }
+
+    game.update([{"agent_id": game.agent_to_move, "move": "g1f3", "legal_moves": True}])
+    game.update([{"agent_id": game.agent_to_move, "move": "b8c6"}])
+
+    states = game.state["state_by_agent"]
+    assert states["foo"]["legal_moves"] == states["bar"]["legal_moves"]
+    assert states["bar"]["last_move"] == "b8c6"
+
+
+def test_full_state_is_left_out_when_not_needed():
+    game = _make_game()
+    for agent in game.agents:
+        agent.clock = None
+    game._incremental_agent_ids = set(game.agent_ids)
+    game.full_state_needed = False
+
+    _play(game, "e2e4", "e7e5")
+
+    assert "fen" not in game.state
+    assert "fen" not in game._ply_cache
+
+    game.full_state_needed = True
+    assert game.state["fen"] == game._board.fen()
+
+
+def test_quiet_plies_adjudication():
+    class QuietConfig(NoAdjudicationConfig):
+        adjudication_quiet_plies = 4
+
+    game = _make_game(config=QuietConfig)
+    _play(game, "g1f3", "g8f6", "f3g1")
+    assert not game.finished
+
+    _play(game, "f6g8")
+    assert game.finished
+    assert game.outcome == {
+        "termination": "ADJUDICATION",
+        "winner": "DRAW",
+        "result": "1/2-1/2",
+        "adjudication_reason": "QUIET_PLIES",
+    }
+    assert game.scores == {"foo": 0.5, "bar": 0.5}
+
+
+def test_material_adjudication():
+    class MaterialConfig(NoAdjudicationConfig):
+        adjudication_material_threshold = 10
+        adjudication_material_plies = 3
+
+    # White is a queen and a rook up
+    game = _make_game(config=MaterialConfig, fen="4k3/8/8/8/8/8/8/R2QK3 w - - 0 1")
+    _play(game, "e1f1", "e8f8")
+    assert not game.finished
+
+    _play(game, "f1g1")
+    assert game.outcome["adjudication_reason"] == "MATERIAL"
+    assert game.outcome["winner"] == "WHITE"
+    assert game.scores == {"foo": 1, "bar": 0}
+
+
+def test_minor_pieces_adjudication():
+    game = _make_game(fen="4k3/8/8/2n5/8/8/8/2B1K3 w - - 0 1")
+
+    assert game.finished
+    assert game.outcome["adjudication_reason"] == "INSUFFICIENT_MATERIAL"
+    assert game.outcome["result"] == "1/2-1/2"
+
+
+@pytest.mark.parametrize("piece", ["Q", "R"])
+def test_quiet_plies_do_not_draw_won_games(piece):
+    # A queen or rook up, with the quiet plies running out
+    game = _make_game(fen=f"4k3/8/8/8/8/8/8/{piece}3K3 w - - 99 80")
+
+    _play(game, "e1f1")
+    assert game._board.halfmove_clock == 100
+    assert not game.finished
+
+    moves = itertools.cycle(["e8f8", "f1e1", "f8e8", "e1f1"])
+    while not game.finished:
+        _play(game, next(moves))
+
+    assert game.outcome["adjudication_reason"] == "MATERIAL"
+    assert game.outcome["winner"] == "WHITE"
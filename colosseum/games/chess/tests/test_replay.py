@@ -0,0 +1,103 @@
+import json
+import random
+
+import chess.pgn
+import pytest
+
+from ....agent import InProcessAgent
+from ....match import run_match
+from ..config import Config
+from ..game import Game
+from ..replay import expand_pgn_replay
+
+
+class JsonlConfig(Config):
+    replay_format = "JSONL"
+
+
+class RandomBot:
+    name = "random"
+
+    def step(self, state):
+        return {"move": random.choice(state["legal_moves"])}
+
+
+class IllegalMoveBot(RandomBot):
+    def __init__(self):
+        self.steps = 0
+
+    def step(self, state):
+        self.steps += 1
+        if self.steps > 2:
+            return {"move": "a1h8"}
+
+        return super().step(state)
+
+
+def _play(config, bot="RandomBot"):
+    game = Game(config=config)
+
+    agents = [
+        InProcessAgent(
+            f"colosseum.games.chess.tests.test_replay:{bot}",
+            id=agent_id,
+            time_config=config,
+        )
+        for agent_id in ["foo", "bar"]
+    ]
+
+    random.seed(4)
+    results = run_match(game, agents=agents)
+
+    with open(results["replay_file"]) as f:
+        return results, f.read()
+
+
+def test_pgn_replay_expands_to_json_lines(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    jsonl_results, jsonl_replay = _play(JsonlConfig)
+    pgn_results, pgn_replay = _play(Config)
+
+    assert jsonl_results["replay_file"].endswith(".jsonl")
+    assert pgn_results["replay_file"].endswith(".pgn")
+    assert len(pgn_replay) * 10 < len(jsonl_replay)
+
+    expanded = expand_pgn_replay(pgn_replay).decode().splitlines()
+    jsonl_lines = [json.loads(line) for line in jsonl_replay.splitlines()]
+    pgn_lines = [json.loads(line) for line in expanded]
+
+    # The game config only differs in the replay format
+    for line in pgn_lines:
+        line["game_config"]["replay_format"] = "JSONL"
+
+    assert pgn_lines == jsonl_lines
+
+
+def test_pgn_replay_tags(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    results, pgn_replay = _play(Config)
+    with open(results["replay_file"]) as f:
+        pgn = chess.pgn.read_game(f)
+
+    white = pgn.headers["WhiteAgentId"]
+    assert {white, pgn.headers["BlackAgentId"]} == {"foo", "bar"}
+    assert pgn.headers["White"] == "random"
+    assert pgn.headers["Result"] == results["outcome"]["result"]
+    assert pgn.headers["Termination"] == results["outcome"]["termination"]
+    assert all(node.emt() is not None for node in pgn.mainline())
+
+
+def test_pgn_replay_is_written_when_the_game_breaks(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    with pytest.raises(chess.IllegalMoveError):
+        _play(Config, bot="IllegalMoveBot")
+
+    (replay_file,) = tmp_path.glob("*.pgn")
+    with open(replay_file) as f:
+        pgn = chess.pgn.read_game(f)
+
+    assert len(list(pgn.mainline_moves())) == 4
+    assert pgn.headers["Result"] == "*"
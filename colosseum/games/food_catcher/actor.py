@@ -1,24 +1,35 @@
 import logging
 
-import numpy as np
-
-from colosseum.utils import object_distance, random_id
+from colosseum.geometry import move_towards
+from colosseum.logs import PER_TICK
+from colosseum.utils import random_id
 
 from .config import Config
+from .store import Column, ObjectColumn, StoredEntity
+
+
+logger = logging.getLogger(__name__)
+
+
+class Actor(StoredEntity):
+    __slots__ = ()
 
+    speed = Config.actor_speed
+    damage = Config.actor_damage
+    max_health = Config.actor_max_health
+
+    owner_id = ObjectColumn("owner_ids")
+    food = Column("food")
+    health = Column("health")
+
+    def __init__(self, store=None):
+        super().__init__(store)
 
-class Actor:
-    def __init__(self):
         self.position = None
         self.id = random_id()
         self.owner_id = None
         self.food = 0
-
-        self.config = Config
-        self.speed = self.config.actor_speed
-        self.damage = self.config.actor_damage
-        self.health = self.config.actor_max_health
-        self.max_health = self.config.actor_max_health
+        self.health = self.max_health
 
     def set_owner(self, owner_id):
         self.owner_id = owner_id
@@ -55,29 +66,34 @@ class Actor:
         return self.health <= 0
 
     def move(self, target):
-        target = np.array(target)
-        actor_position = np.array(self.position)
-        move_direction = target - actor_position
-        distance_to_target = np.linalg.norm(move_direction)
-        distance_to_move = min(self.speed, distance_to_target)
-
-        if distance_to_move > 1e-4:
-            actor_position_new = actor_position + (
-                move_direction / distance_to_target * distance_to_move
-            )
-            self.position = tuple(actor_position_new.tolist())
-            logging.info(
-                f"actor {self.id} moved from {actor_position} to {actor_position_new} with target {target} speed {distance_to_move}"
+        actor_position = self.position
+        actor_position_new = move_towards(actor_position, target, self.speed)
+
+        if actor_position_new is not actor_position:
+            self.position = actor_position_new
+            logger.debug(
+                "actor %s moved from %s to %s with target %s speed %s",
+                self.id,
+                actor_position,
+                actor_position_new,
+                target,
+                self.speed,
+                extra=PER_TICK,
             )
             return
 
-        logging.info(f"actor {self.id} {actor_position=} is already at {target=}")
+        logger.debug(
+            "actor %s actor_position=%s is already at target=%s",
+            self.id,
+            actor_position,
+            target,
+            extra=PER_TICK,
+        )
 
     def kill(self):
         self.health = 0
 
-    @property
-    def state(self):
+    def _build_state(self):
         return {
             "position": self.position,
             "id": self.id,
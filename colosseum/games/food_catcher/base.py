@@ -1,14 +1,25 @@
 from colosseum.utils import random_id
 
+from .store import Column, ObjectColumn, StoredEntity
+
+
+class Base(StoredEntity):
+    __slots__ = ()
+
+    max_health = 50
+
+    owner_id = ObjectColumn("owner_ids")
+    food = Column("food")
+    health = Column("health")
+
+    def __init__(self, store=None):
+        super().__init__(store)
 
-class Base:
-    def __init__(self):
         self.position = None
         self.id = random_id()
         self.owner_id = None
         self.food = 0
-        self.health = 50
-        self.max_health = self.health
+        self.health = self.max_health
 
     def set_owner(self, owner_id):
         self.owner_id = owner_id
@@ -42,8 +53,7 @@ class Base:
     def dead(self):
         return self.health <= 0
 
-    @property
-    def state(self):
+    def _build_state(self):
         return {
             "position": self.position,
             "id": self.id,
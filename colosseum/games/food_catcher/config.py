@@ -16,6 +16,10 @@ class Config:
     base_spawn_border_offset = 0.15
     n_epochs = 10000
 
+    # When set, agents only see their own entities and what is within this
+    # distance of them
+    view_radius = None
+
     # Actor Settings
     actor_speed = 1
     actor_damage = 5
@@ -24,3 +28,12 @@ class Config:
     # Time settings
     step_time_limit = 200  # 200 ms
     step_limit_pool = 2000  # 2 seconds
+
+
+class FogOfWarConfig(Config):
+    game_name = "food_catcher_fog"
+
+    grid_width = 200
+    grid_height = 200
+    max_food_sources = 400
+    view_radius = 10
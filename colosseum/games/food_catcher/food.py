@@ -2,16 +2,24 @@ from random import uniform
 
 from colosseum.utils import random_id
 
+from .store import Column, StoredEntity
+
+
+class Food(StoredEntity):
+    __slots__ = ()
+
+    quantity_max = 50
+    quantity_min = 0.1
+    growth_rate = 0.05
+
+    quantity = Column("quantity")
+
+    def __init__(self, store=None):
+        super().__init__(store)
 
-class Food:
-    def __init__(self):
         self.position = None
         self.id = random_id()
 
-        self.quantity_max = 50
-        self.quantity_min = 0.1
-        self.growth_rate = 0.05
-
         self.quantity = uniform(self.quantity_min, self.quantity_max)
 
     def set_quantity(self, quantity):
@@ -41,6 +49,5 @@ class Food:
     def vanished(self):
         return self.quantity < self.quantity_min
 
-    @property
-    def state(self):
+    def _build_state(self):
         return {"position": self.position, "quantity": self.quantity, "id": self.id}
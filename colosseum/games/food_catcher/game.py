@@ -1,10 +1,11 @@
+import copy
 import itertools
 import logging
+import math
 from collections import defaultdict
 from random import shuffle, uniform
 
-import numpy as np
-
+from colosseum.logs import PER_TICK
 from colosseum.utils import object_distance, random_id
 
 from ..game import BaseGame
@@ -12,6 +13,11 @@ from .actor import Actor
 from .base import Base
 from .config import Config
 from .food import Food
+from .spatial import SpatialHash
+from .store import EntityStore
+
+
+logger = logging.getLogger(__name__)
 
 
 class World(BaseGame):
@@ -27,7 +33,20 @@ class World(BaseGame):
         self.bases = []
         self.foods = []
         self.actors = []
+
+        # Same entities as the lists above, keyed by id. The lists keep the
+        # order used for the state, the dicts are for lookups by id.
+        self._bases_by_id = {}
+        self._foods_by_id = {}
+        self._actors_by_id = {}
+
+        # Numeric fields of every entity in the world live here, in arrays
+        self._store = EntityStore()
+
+        # Entities that died in the last tick, and every one that ever died
         self.dead_entities = []
+        self._graveyard = {}
+        self._graveyard_requests = set()
         self.agents = set()
         self.agent_ids = set()
 
@@ -43,15 +62,27 @@ class World(BaseGame):
         self._make_base_cost = self._config.make_base_cost
         self._base_spawn_border_offset = self._config.base_spawn_border_offset
         self._n_epochs = self._config.n_epochs
+        self._view_radius = self._config.view_radius
 
         self._tick = 0
 
+        # Actors are indexed by position. Cells are large enough that both
+        # collisions and attacks only need to look at the neighbouring cells.
+        self._actor_grid_cell_size = max(self._actor_radius * 2, self._attack_range)
+        self._actor_grid = SpatialHash(self._actor_grid_cell_size)
+
+        # Every entity, indexed to find what each agent can see. Without a
+        # view radius everything is visible, and there is no grid to keep.
+        self._view_grid = None
+        if self._view_radius is not None:
+            self._view_grid = SpatialHash(self._view_radius)
+
         self._base_spawn_slots = []
         self._set_base_spawn_slots()
 
         self._spawn_food()
 
-        logging.info("food_catcher initialized")
+        logger.info("food_catcher initialized")
 
     def register_agent(self, agent):
         super().register_agent(agent)
@@ -65,62 +96,177 @@ class World(BaseGame):
         while len(self.foods) < self._max_food_sources:
             x, y = (uniform(0, self.width), uniform(0, self.height))
 
-            self.foods.append(Food().set_position((x, y)))
-            self.foods.append(Food().set_position((self.width - x, y)))
-            self.foods.append(Food().set_position((x, self.height - y)))
-            self.foods.append(Food().set_position((self.width - x, self.height - y)))
+            for position in [
+                (x, y),
+                (self.width - x, y),
+                (x, self.height - y),
+                (self.width - x, self.height - y),
+            ]:
+                food = Food(self._store).set_position(position)
+                self.foods.append(food)
+                self._foods_by_id[food.id] = food
+                if self._view_grid is not None:
+                    self._view_grid.insert(food)
 
     def _update_food(self):
-        self.foods = [food for food in self.foods if not food.vanished]
+        rows = [food._row for food in self.foods]
+        vanished = self._store.below_quantity(rows, Food.quantity_min).tolist()
+
+        foods = []
+        for food, food_vanished in zip(self.foods, vanished):
+            if food_vanished:
+                del self._foods_by_id[food.id]
+                if self._view_grid is not None:
+                    self._view_grid.remove(food)
+                food.detach()
+            else:
+                foods.append(food)
+
+        self.foods = foods
 
-        for food in self.foods:
-            food.update()
+        self._store.grow_quantity(
+            [food._row for food in self.foods], Food.growth_rate, Food.quantity_max
+        )
 
         self._spawn_food()
 
     def _update_actors(self):
-        for i in range(len(self.actors)):
-            actor1 = self.actors[i]
-            if actor1.dead:
+        collision_distance = self._actor_radius * 2
+        order = {actor: i for i, actor in enumerate(self.actors)}
+
+        # Only nearby actors can collide, so the candidate pairs come from the
+        # grid, and their distances are all computed in one go
+        pairs = []
+        for i, actor1 in enumerate(self.actors):
+            neighbours = sorted(
+                (
+                    actor
+                    for actor in self._actor_grid.query(
+                        actor1.position, collision_distance
+                    )
+                    if order.get(actor, -1) > i
+                ),
+                key=order.__getitem__,
+            )
+            pairs.extend((actor1, actor2) for actor2 in neighbours)
+
+        distances = self._store.distances(
+            [actor1._row for actor1, _ in pairs], [actor2._row for _, actor2 in pairs]
+        ).tolist()
+
+        # Collisions are resolved in list order, same as if every pair was
+        # checked one by one, since who collides first changes the outcome.
+        # Actors already dead when their turn comes are skipped.
+        current_actor = None
+        skip = False
+        for (actor1, actor2), distance in zip(pairs, distances):
+            if distance >= collision_distance:
                 continue
 
-            for j in range(i + 1, len(self.actors)):
-                actor2 = self.actors[j]
-                if actor2.dead:
-                    continue
+            if actor1 is not current_actor:
+                current_actor = actor1
+                skip = actor1.dead
 
-                distance = object_distance(actor1, actor2)
-                if distance < self._actor_radius * 2:
-                    if actor1.food < actor2.food:
-                        actor1.add_food(actor2.take_food())
-                        actor2.kill()
-                    else:
-                        actor2.add_food(actor1.take_food())
-                        actor1.kill()
+            if skip or actor2.dead:
+                continue
 
-        self.actors = [actor for actor in self.actors if actor.alive]
+            if actor1.food < actor2.food:
+                actor1.add_food(actor2.take_food())
+                actor2.kill()
+            else:
+                actor2.add_food(actor1.take_food())
+                actor1.kill()
+
+        actors = []
+        for actor in self.actors:
+            if actor.dead:
+                self._actor_grid.remove(actor)
+                if self._view_grid is not None:
+                    self._view_grid.remove(actor)
+                del self._actors_by_id[actor.id]
+                actor.detach()
+                self._bury(actor)
+            else:
+                actors.append(actor)
+
+        self.actors = actors
 
     def _update_bases(self):
-        self.bases = [base for base in self.bases if base.alive]
+        bases = []
+        for base in self.bases:
+            if base.dead:
+                del self._bases_by_id[base.id]
+                if self._view_grid is not None:
+                    self._view_grid.remove(base)
+                base.detach()
+                self._bury(base)
+            else:
+                bases.append(base)
 
-    def _update_dead_entities(self):
-        for entity in itertools.chain.from_iterable([self.actors, self.bases]):
-            if entity.dead:
-                self.dead_entities.append(entity)
+        self.bases = bases
+
+    def _bury(self, entity):
+        if entity.id not in self._graveyard:
+            self._graveyard[entity.id] = entity
+            self.dead_entities.append(entity)
 
     @property
     def state(self):
-        self._update_dead_entities()
-        self._update_bases()
-        self._update_actors()
-
-        return {
+        state = {
             "foods": self.foods_state,
             "actors": self.actors_state,
             "bases": self.bases_state,
             "dead_entities": self.dead_entities_state,
         }
 
+        if self._view_radius is not None:
+            state["state_by_agent"] = {
+                agent_id: self._agent_view(agent_id) for agent_id in self.agent_ids
+            }
+        elif self._graveyard_requests:
+            state["graveyard"] = self.graveyard_state
+
+        return state
+
+    def _agent_view(self, owner_id):
+        """
+        State as seen by one agent: its own entities, and whatever is within
+        the view radius of any of them.
+        """
+        observers = [
+            entity
+            for entity in itertools.chain(self.actors, self.bases)
+            if entity.owner_id == owner_id
+        ]
+
+        visible = set(observers)
+        for observer in observers:
+            visible.update(self._view_grid.within(observer.position, self._view_radius))
+
+        def _seen(entity):
+            return entity.owner_id == owner_id or any(
+                object_distance(entity, observer) <= self._view_radius
+                for observer in observers
+            )
+
+        view = {
+            "foods": [food.state for food in self.foods if food in visible],
+            "actors": [actor.state for actor in self.actors if actor in visible],
+            "bases": [base.state for base in self.bases if base in visible],
+            "dead_entities": [
+                entity.state for entity in self.dead_entities if _seen(entity)
+            ],
+        }
+
+        if owner_id in self._graveyard_requests:
+            view["graveyard"] = [
+                entity.state
+                for entity in self._graveyard.values()
+                if entity.owner_id == owner_id
+            ]
+
+        return view
+
     @property
     def actors_state(self):
         return [actor.state for actor in self.actors]
@@ -137,16 +283,71 @@ class World(BaseGame):
     def dead_entities_state(self):
         return [entity.state for entity in self.dead_entities]
 
+    @property
+    def graveyard_state(self):
+        return [entity.state for entity in self._graveyard.values()]
+
     def update(self, agent_actions):
         self._tick += 1
+        self.dead_entities = []
+        self._graveyard_requests = set()
         self._update_food()
 
         # We shuffle to use as a tiebreaker when multiple agents are trying to
         # do the same thing at the same time
         shuffle(agent_actions)
 
-        for agent_action in agent_actions:
-            self.process_agent_actions(agent_action)
+        self._resolve_actions(self._validate_actions(agent_actions))
+
+        self._update_bases()
+        self._update_actors()
+
+    def _copy_state(self, state):
+        # Entity fields live in the store, so each entity copy is pointed to
+        # a copy of it. Entities that just died are also in the graveyard, so
+        # the copies are shared to keep them the same object.
+        old_store = state["_store"]
+        store = old_store.copy()
+        copies = {}
+
+        def _copy(entity):
+            if id(entity) not in copies:
+                entity_copy = copy.copy(entity)
+                if entity._store is old_store:
+                    entity_copy._store = store
+                else:
+                    entity_copy._store = entity._store.copy()
+                copies[id(entity)] = entity_copy
+            return copies[id(entity)]
+
+        foods = [_copy(food) for food in state["foods"]]
+        actors = [_copy(actor) for actor in state["actors"]]
+        bases = [_copy(base) for base in state["bases"]]
+
+        view_grid = None
+        if state["_view_grid"] is not None:
+            entities = itertools.chain(foods, actors, bases)
+            view_grid = SpatialHash(state["_view_radius"], entities)
+
+        return {
+            **state,
+            "agent_ids": set(state["agent_ids"]),
+            "foods": foods,
+            "actors": actors,
+            "bases": bases,
+            "_foods_by_id": {food.id: food for food in foods},
+            "_actors_by_id": {actor.id: actor for actor in actors},
+            "_bases_by_id": {base.id: base for base in bases},
+            "_actor_grid": SpatialHash(state["_actor_grid_cell_size"], actors),
+            "_view_grid": view_grid,
+            "_graveyard_requests": set(state["_graveyard_requests"]),
+            "_store": store,
+            "dead_entities": [_copy(entity) for entity in state["dead_entities"]],
+            "_graveyard": {
+                id: _copy(entity) for id, entity in state["_graveyard"].items()
+            },
+            "_base_spawn_slots": [list(slot) for slot in state["_base_spawn_slots"]],
+        }
 
     @property
     def scores(self):
@@ -177,166 +378,248 @@ class World(BaseGame):
         return outcome
 
     def process_agent_actions(self, agent_action):
-        owner_id = agent_action.get("agent_id")
-        if owner_id not in self.agent_ids:
-            logging.warning(f"agent with id {owner_id} is not registered. Ignoring")
-            return
+        self._resolve_actions(self._validate_actions([agent_action]))
+
+    def _validate_actions(self, agent_actions):
+        """
+        Checks all actions in a single pass against ``_ACTIONS`` and groups
+        the valid ones by type, keeping the order they were given in. Invalid
+        actions are dropped, as are actions on actors that do not belong to
+        the agent, and any action on an actor that already got one this tick.
+        """
+        grouped_actions = defaultdict(list)
+        busy_actors = set()
 
-        actions = agent_action.get("actions", [])
+        for agent_action in agent_actions:
+            owner_id = agent_action.get("agent_id")
+            if owner_id not in self.agent_ids:
+                logger.warning("agent with id %s is not registered. Ignoring", owner_id)
+                continue
 
-        for action in actions:
-            action_type = action.get("action")
-            actor_id = action.get("actor_id")
+            if agent_action.get("graveyard") is True:
+                self._graveyard_requests.add(owner_id)
+
+            actions = agent_action.get("actions", [])
+            if not isinstance(actions, list):
+                continue
 
-            # TODO: Prevent single actor from doing multiple actions in the
-            # same frame.
-            if action_type == "move":
-                target = action.get("target")
-                self.move_actor(owner_id, actor_id, target)
+            for action in actions:
+                if not isinstance(action, dict):
+                    continue
 
-            if action_type == "take_food":
-                food_id = action.get("food_id")
-                self.take_food(owner_id, actor_id, food_id)
+                action_type = action.get("action")
+                if action_type not in self._ACTIONS:
+                    continue
 
-            if action_type == "deposit_food":
-                base_id = action.get("base_id")
-                self.deposit_food(owner_id, actor_id, base_id)
+                validate, _ = self._ACTIONS[action_type]
+                validated_action = validate(self, owner_id, action)
+                if validated_action is None:
+                    continue
 
-            if action_type == "heal":
-                base_id = action.get("base_id")
-                self.heal(owner_id, actor_id, base_id)
+                actor = validated_action[0]
+                if isinstance(actor, Actor):
+                    if actor in busy_actors:
+                        continue
+                    busy_actors.add(actor)
 
-            if action_type == "spawn":
-                base_id = action.get("base_id")
-                self.spawn(owner_id, base_id)
+                grouped_actions[action_type].append(validated_action)
 
-            if action_type == "attack":
-                target = action.get("target")
-                self.attack(owner_id, actor_id, target)
+        return grouped_actions
 
-            if action_type == "make_base":
-                self.make_base(owner_id, actor_id)
+    def _resolve_actions(self, grouped_actions):
+        for action_type, (_, resolve) in self._ACTIONS.items():
+            if actions := grouped_actions.get(action_type):
+                resolve(self, actions)
 
-    # TODO: resolve collisions
-    def move_actor(self, owner_id, actor_id, target):
-        actor = self._get_actor(actor_id)
+    def _get_owned_actor(self, owner_id, action):
+        actor = self._get_actor(action.get("actor_id"))
 
-        if not actor:
-            return
+        if actor and actor.owner_id == owner_id:
+            return actor
 
-        # TODO: Ensure that the actor belongs to the owner
-        actor.move(target)
+    def _validate_move(self, owner_id, action):
+        actor = self._get_owned_actor(owner_id, action)
+        target = _as_position(action.get("target"))
 
-    def take_food(self, owner_id, actor_id, food_id):
-        actor = self._get_actor(actor_id)
-        food = self._get_food(food_id)
+        if actor and target:
+            return (actor, target)
 
-        if not food or not actor:
-            return
+    def _validate_take_food(self, owner_id, action):
+        actor = self._get_owned_actor(owner_id, action)
+        food = self._get_food(action.get("food_id"))
 
-        distance = object_distance(actor, food)
-        if distance > self._take_food_max_distance:
-            return
+        if actor and food:
+            return (actor, food)
 
-        food_taken = food.take(self._take_food_speed)
-        actor.add_food(food_taken)
+    def _validate_base_action(self, owner_id, action):
+        actor = self._get_owned_actor(owner_id, action)
+        base = self._get_base(action.get("base_id"))
 
-    def deposit_food(self, owner_id, actor_id, base_id):
-        actor = self._get_actor(actor_id)
-        base = self._get_base(base_id)
+        if actor and base:
+            return (actor, base)
 
-        if not actor or not base:
-            return
+    def _validate_attack(self, owner_id, action):
+        actor = self._get_owned_actor(owner_id, action)
+        target_id = action.get("target")
+        target = self._get_base(target_id) or self._get_actor(target_id)
 
-        distance = object_distance(actor, base)
-        if distance > self._deposit_food_max_distance:
-            logging.info(
-                f"actor {actor_id} is too far from base {base_id} to deposit: {distance}"
-            )
-            return
+        if actor and target:
+            return (actor, target)
 
-        logging.info(f"actor {actor_id} deposited {actor.food} into {base_id}")
-        base.add_food(actor.take_food())
+    def _validate_spawn(self, owner_id, action):
+        base = self._get_base(action.get("base_id"))
 
-    def heal(self, owner_id, actor_id, base_id):
-        actor = self._get_actor(actor_id)
-        base = self._get_base(base_id)
+        if base and base.owner_id == owner_id:
+            return (base, owner_id)
 
-        if not actor or not base:
-            return
+    def _validate_make_base(self, owner_id, action):
+        actor = self._get_owned_actor(owner_id, action)
 
-        distance = object_distance(actor, base)
-        if distance > self._deposit_food_max_distance:
-            logging.info(
-                f"actor {actor_id} is too far from base {base_id} to heal: {distance}"
-            )
-            return
+        if actor:
+            return (actor, owner_id)
 
-        missing_health = actor.missing_health
-        heal_amount = min(missing_health, base.food)
-        actor.heal(heal_amount)
-        base.drain_food(heal_amount)
+    def _distances(self, actions):
+        # Every resolver gets (actor, target, ...) tuples, with both in the store
+        return self._store.distances(
+            [action[0]._row for action in actions],
+            [action[1]._row for action in actions],
+        ).tolist()
 
-    def attack(self, owner_id, actor_id, target_id):
-        actor = self._get_actor(actor_id)
-        target = self._get_base(target_id) or self._get_actor(target_id)
+    # TODO: resolve collisions
+    def _resolve_moves(self, actions):
+        actors = [actor for actor, _ in actions]
 
-        if not actor or not target:
-            return
+        self._store.move_towards(
+            [actor._row for actor in actors],
+            [target for _, target in actions],
+            [actor.speed for actor in actors],
+        )
 
-        distance = object_distance(actor, target)
-        if distance > self._attack_range:
-            return
+        for actor in actors:
+            self._actor_grid.update(actor)
 
-        damage = actor.damage
-        target.deal_damage(damage)
+        if self._view_grid is not None:
+            for actor in actors:
+                self._view_grid.update(actor)
 
-    def spawn(self, owner_id, base_id):
-        base = self._get_base(base_id)
+        logger.debug("moved %s actors", len(actors), extra=PER_TICK)
 
-        if base.food < self._spawn_actor_cost:
-            return
+    def _resolve_take_food(self, actions):
+        for (actor, food), distance in zip(actions, self._distances(actions)):
+            if distance > self._take_food_max_distance:
+                continue
+
+            food_taken = food.take(self._take_food_speed)
+            actor.add_food(food_taken)
+
+    def _resolve_deposit_food(self, actions):
+        for (actor, base), distance in zip(actions, self._distances(actions)):
+            if distance > self._deposit_food_max_distance:
+                logger.debug(
+                    "actor %s is too far from base %s to deposit: %s",
+                    actor.id,
+                    base.id,
+                    distance,
+                )
+                continue
+
+            logger.info("actor %s deposited %s into %s", actor.id, actor.food, base.id)
+            base.add_food(actor.take_food())
+
+    def _resolve_heal(self, actions):
+        for (actor, base), distance in zip(actions, self._distances(actions)):
+            if distance > self._deposit_food_max_distance:
+                logger.debug(
+                    "actor %s is too far from base %s to heal: %s",
+                    actor.id,
+                    base.id,
+                    distance,
+                )
+                continue
+
+            missing_health = actor.missing_health
+            heal_amount = min(missing_health, base.food)
+            actor.heal(heal_amount)
+            base.drain_food(heal_amount)
+
+    def _resolve_spawn(self, actions):
+        for base, owner_id in actions:
+            if base.food < self._spawn_actor_cost:
+                continue
+
+            base.drain_food(self._spawn_actor_cost)
+            actor = self._spawn_actor(owner_id, base.position)
 
-        base.drain_food(self._spawn_actor_cost)
-        actor = self._spawn_actor(owner_id, base.position)
+            logger.info("base %s spawned actor %s", base.id, actor.id)
 
-        logging.info(f"base {base_id} spawned actor {actor.id}")
+    def _resolve_attacks(self, actions):
+        hits = [
+            (actor, target)
+            for (actor, target), distance in zip(actions, self._distances(actions))
+            if distance <= self._attack_range
+        ]
 
-    def make_base(self, owner_id, actor_id):
-        actor = self._get_actor(actor_id)
+        # Damage just adds up, so all hits are applied at once
+        self._store.subtract_health(
+            [target._row for _, target in hits],
+            [actor.damage for actor, _ in hits],
+        )
 
-        if actor.health < self._make_base_cost:
-            return
+    def _resolve_make_base(self, actions):
+        for actor, owner_id in actions:
+            if actor.health < self._make_base_cost:
+                continue
 
-        actor.die()
-        food = actor.take_food()
-        base = self._spawn_base(owner_id, position=food.position)
-        base.food = food - self._make_base_cost
+            actor.kill()
+            food = actor.take_food()
+            base = self._spawn_base(owner_id, position=actor.position)
+            base.food = food - self._make_base_cost
+
+    # Every action type agents can use, mapped to the methods validating a
+    # single action and resolving all the valid ones at once. Types are
+    # resolved in this order, so e.g. actions that need to be close to
+    # something see where actors moved to this tick.
+    _ACTIONS = {
+        "move": (_validate_move, _resolve_moves),
+        "take_food": (_validate_take_food, _resolve_take_food),
+        "deposit_food": (_validate_base_action, _resolve_deposit_food),
+        "heal": (_validate_base_action, _resolve_heal),
+        "spawn": (_validate_spawn, _resolve_spawn),
+        "attack": (_validate_attack, _resolve_attacks),
+        "make_base": (_validate_make_base, _resolve_make_base),
+    }
 
     def _spawn_actor(self, owner_id, position=None):
         if position is None:
             position = (uniform(0, self.width), uniform(0, self.width))
 
-        actor = Actor().set_owner(owner_id).set_position(position)
+        actor = Actor(self._store).set_owner(owner_id).set_position(position)
         self.actors.append(actor)
+        self._actors_by_id[actor.id] = actor
+        self._actor_grid.insert(actor)
+        if self._view_grid is not None:
+            self._view_grid.insert(actor)
         return actor
 
     def _spawn_base(self, owner_id, position=None):
         if position is None:
             position = (uniform(0, self.width), uniform(0, self.width))
 
-        base = Base().set_owner(owner_id).set_position(position)
+        base = Base(self._store).set_owner(owner_id).set_position(position)
         self.bases.append(base)
+        self._bases_by_id[base.id] = base
+        if self._view_grid is not None:
+            self._view_grid.insert(base)
         return base
 
     def _get_food(self, id):
-        return next((food for food in self.foods if food.id == id), None)
+        return _get_by_id(self._foods_by_id, id)
 
     def _get_actor(self, id):
-        return next((actor for actor in self.actors if actor.id == id), None)
+        return _get_by_id(self._actors_by_id, id)
 
     def _get_base(self, id):
-        return next((base for base in self.bases if base.id == id), None)
+        return _get_by_id(self._bases_by_id, id)
 
     def _set_base_spawn_slots(self):
         offset = self._base_spawn_border_offset
@@ -351,3 +634,24 @@ class World(BaseGame):
         shuffle(self._base_spawn_slots)
         position = self._base_spawn_slots.pop(0)
         return position
+
+
+def _get_by_id(registry, id):
+    # Ids come straight from the agents, and may not even be hashable
+    if not isinstance(id, str):
+        return None
+
+    return registry.get(id)
+
+
+def _as_position(value):
+    try:
+        x, y = value
+        position = (float(x), float(y))
+    except (TypeError, ValueError):
+        return None
+
+    if not all(math.isfinite(v) for v in position):
+        return None
+
+    return position
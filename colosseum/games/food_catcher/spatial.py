@@ -0,0 +1,84 @@
+import math
+from collections import defaultdict
+
+from colosseum.geometry import distance
+
+
+class SpatialHash:
+    """
+    Uniform grid index over entities with a ``position``. Entities are bucketed
+    by the cell their position falls in, so finding what is near a point only
+    looks at a few cells instead of every entity.
+
+    The index does not notice when entities move, whoever moves one must call
+    ``update`` afterwards.
+    """
+
+    def __init__(self, cell_size, entities=()):
+        self.cell_size = cell_size
+        self._cells = defaultdict(dict)
+        self._entity_cells = {}
+
+        for entity in entities:
+            self.insert(entity)
+
+    def __len__(self):
+        return len(self._entity_cells)
+
+    def __contains__(self, entity):
+        return entity in self._entity_cells
+
+    def insert(self, entity):
+        cell = self._cell(entity.position)
+        self._cells[cell][entity] = None
+        self._entity_cells[entity] = cell
+
+    def remove(self, entity):
+        cell = self._entity_cells.pop(entity, None)
+        if cell is None:
+            return
+
+        bucket = self._cells[cell]
+        del bucket[entity]
+        if not bucket:
+            del self._cells[cell]
+
+    def update(self, entity):
+        cell = self._cell(entity.position)
+        old_cell = self._entity_cells.get(entity)
+
+        if cell == old_cell:
+            return
+
+        if old_cell is not None:
+            self.remove(entity)
+
+        self._cells[cell][entity] = None
+        self._entity_cells[entity] = cell
+
+    def query(self, position, radius):
+        """
+        Yields the entities in every cell touching the square of side
+        ``2 * radius`` centered at ``position``. This is a superset of the
+        entities within ``radius``, use ``within`` for the exact set.
+        """
+        x, y = position
+        min_x, min_y = self._cell((x - radius, y - radius))
+        max_x, max_y = self._cell((x + radius, y + radius))
+
+        for cell_x in range(min_x, max_x + 1):
+            for cell_y in range(min_y, max_y + 1):
+                bucket = self._cells.get((cell_x, cell_y))
+                if bucket:
+                    yield from bucket
+
+    def within(self, position, radius):
+        return [
+            entity
+            for entity in self.query(position, radius)
+            if distance(entity.position, position) <= radius
+        ]
+
+    def _cell(self, position):
+        x, y = position
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
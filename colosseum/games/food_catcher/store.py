@@ -0,0 +1,247 @@
+import numpy as np
+
+from colosseum.geometry import pairwise_distances
+
+
+class EntityStore:
+    """
+    Struct of arrays holding the fields of food_catcher entities, one row per
+    entity. Numeric fields live in contiguous NumPy arrays, so per tick work
+    like growing food or moving actors can be done for many entities at once.
+
+    Rows are handed out by ``allocate`` and given back with ``release``. Rows
+    never move, freed ones are just reused, so an entity keeps the same row for
+    as long as it is in the store.
+
+    Each row also caches the entity's state dict. Anything writing to a row
+    flags it in ``dirty``, and the state is only rebuilt for flagged rows.
+    """
+
+    def __init__(self, capacity=64):
+        capacity = max(1, capacity)
+
+        self.positions = np.full((capacity, 2), np.nan)
+        self.health = np.zeros(capacity)
+        self.food = np.zeros(capacity)
+        self.quantity = np.zeros(capacity)
+        self.ids = [None] * capacity
+        self.owner_ids = [None] * capacity
+        self.dirty = np.ones(capacity, dtype=bool)
+        self.states = [None] * capacity
+
+        self._free_rows = list(range(capacity - 1, -1, -1))
+
+    @property
+    def capacity(self):
+        return len(self.ids)
+
+    def __len__(self):
+        return self.capacity - len(self._free_rows)
+
+    def allocate(self):
+        if not self._free_rows:
+            self._grow()
+
+        return self._free_rows.pop()
+
+    def release(self, row):
+        self.positions[row] = np.nan
+        self.health[row] = 0
+        self.food[row] = 0
+        self.quantity[row] = 0
+        self.ids[row] = None
+        self.owner_ids[row] = None
+        self.dirty[row] = True
+        self.states[row] = None
+
+        self._free_rows.append(row)
+
+    def copy_row(self, row, store, store_row):
+        """
+        Copies ``row`` into ``store_row`` of another store.
+        """
+        store.positions[store_row] = self.positions[row]
+        store.health[store_row] = self.health[row]
+        store.food[store_row] = self.food[row]
+        store.quantity[store_row] = self.quantity[row]
+        store.ids[store_row] = self.ids[row]
+        store.owner_ids[store_row] = self.owner_ids[row]
+        store.dirty[store_row] = self.dirty[row]
+        store.states[store_row] = self.states[row]
+
+    def copy(self):
+        store = EntityStore.__new__(EntityStore)
+        store.positions = self.positions.copy()
+        store.health = self.health.copy()
+        store.food = self.food.copy()
+        store.quantity = self.quantity.copy()
+        store.ids = list(self.ids)
+        store.owner_ids = list(self.owner_ids)
+        store.dirty = self.dirty.copy()
+        store.states = list(self.states)
+        store._free_rows = list(self._free_rows)
+        return store
+
+    def grow_quantity(self, rows, rate, maximum):
+        rows = np.asarray(rows, dtype=int)
+        quantity = self.quantity[rows]
+        grown = np.minimum(quantity * (1.0 + rate), maximum)
+
+        self.quantity[rows] = grown
+        self.dirty[rows[grown != quantity]] = True
+
+    def subtract_health(self, rows, amounts):
+        """
+        Subtracts each amount from the health of its row. Rows may repeat, in
+        which case all their amounts are subtracted.
+        """
+        rows = np.asarray(rows, dtype=int)
+
+        np.subtract.at(self.health, rows, amounts)
+        self.dirty[rows] = True
+
+    def below_quantity(self, rows, minimum):
+        return self.quantity[rows] < minimum
+
+    def move_towards(self, rows, targets, speeds):
+        """
+        Moves each row in ``rows`` towards its target, by at most its speed.
+        ``targets`` is an array of shape (len(rows), 2). Rows closer than
+        1e-4 to their targets stay put.
+        """
+        rows = np.asarray(rows, dtype=int)
+        positions = self.positions[rows]
+        move_direction = np.asarray(targets, dtype=float) - positions
+        distance_to_target = np.hypot(move_direction[:, 0], move_direction[:, 1])
+        distance_to_move = np.minimum(speeds, distance_to_target)
+
+        moving = distance_to_move > 1e-4
+        positions[moving] += (
+            move_direction[moving]
+            / distance_to_target[moving, np.newaxis]
+            * distance_to_move[moving, np.newaxis]
+        )
+        self.positions[rows] = positions
+        self.dirty[rows[moving]] = True
+
+    def distances(self, rows_a, rows_b):
+        """
+        Distances between the rows in ``rows_a`` and the ones in ``rows_b``,
+        pairwise and in order.
+        """
+        return pairwise_distances(self.positions[rows_a], self.positions[rows_b])
+
+    def _grow(self):
+        capacity = self.capacity
+
+        self.positions = np.concatenate(
+            [self.positions, np.full((capacity, 2), np.nan)]
+        )
+        self.health = np.concatenate([self.health, np.zeros(capacity)])
+        self.food = np.concatenate([self.food, np.zeros(capacity)])
+        self.quantity = np.concatenate([self.quantity, np.zeros(capacity)])
+        self.ids.extend([None] * capacity)
+        self.owner_ids.extend([None] * capacity)
+        self.dirty = np.concatenate([self.dirty, np.ones(capacity, dtype=bool)])
+        self.states.extend([None] * capacity)
+
+        self._free_rows.extend(range(2 * capacity - 1, capacity - 1, -1))
+
+
+class Column:
+    """
+    Descriptor exposing a numeric column of the entity's store as a plain
+    attribute. Whole numbers are read back as ints.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, entity, owner=None):
+        if entity is None:
+            return self
+
+        # Columns are floats, but whole numbers are given back as ints, which
+        # is what the entities held before the store and what agents expect
+        value = getattr(entity._store, self.name).item(entity._row)
+        return int(value) if value.is_integer() else value
+
+    def __set__(self, entity, value):
+        getattr(entity._store, self.name)[entity._row] = value
+        entity._store.dirty[entity._row] = True
+
+
+class ObjectColumn(Column):
+    def __get__(self, entity, owner=None):
+        if entity is None:
+            return self
+
+        return getattr(entity._store, self.name)[entity._row]
+
+
+class PositionColumn:
+    def __get__(self, entity, owner=None):
+        if entity is None:
+            return self
+
+        positions = entity._store.positions
+        x = positions.item(entity._row, 0)
+        if x != x:
+            # Position was never set
+            return None
+
+        return (x, positions.item(entity._row, 1))
+
+    def __set__(self, entity, value):
+        if value is None:
+            value = np.nan
+
+        entity._store.positions[entity._row] = value
+        entity._store.dirty[entity._row] = True
+
+
+class StoredEntity:
+    """
+    Base for entities whose fields live in an ``EntityStore``, exposed through
+    the column descriptors above. Entities made without a store get a private
+    one, so they also work on their own.
+    """
+
+    __slots__ = ("_store", "_row")
+
+    id = ObjectColumn("ids")
+    position = PositionColumn()
+
+    def __init__(self, store=None):
+        if store is None:
+            store = EntityStore(capacity=1)
+
+        self._store = store
+        self._row = self._store.allocate()
+
+    @property
+    def state(self):
+        store = self._store
+        row = self._row
+
+        if store.dirty[row]:
+            store.states[row] = self._build_state()
+            store.dirty[row] = False
+
+        return store.states[row]
+
+    def _build_state(self):
+        raise NotImplementedError
+
+    def detach(self):
+        """
+        Moves the entity out of its store and into a private one. Used when
+        the entity leaves the world, so its row can be reused while the
+        entity itself is still around (e.g. as a dead entity).
+        """
+        store = EntityStore(capacity=1)
+        row = store.allocate()
+        self._store.copy_row(self._row, store, row)
+        self._store.release(self._row)
+        self._store = store
+        self._row = row
@@ -0,0 +1,272 @@
+import random
+
+from colosseum.utils import object_distance
+
+from ...vec_game import Seat
+from ..config import Config, FogOfWarConfig
+from ..game import World
+
+
+def _make_world(n_agents=2):
+    world = World()
+    for i in range(n_agents):
+        world.register_agent(Seat(f"agent_{i}"))
+    return world
+
+
+def test_registries_follow_entity_lists():
+    random.seed(3)
+    world = _make_world()
+
+    for base in world.bases:
+        base.add_food(10000)
+
+    for tick in range(50):
+        actions = []
+        for agent_id in world.agent_ids:
+            agent_actions = [
+                {"action": "spawn", "base_id": base.id}
+                for base in world.bases
+                if base.owner_id == agent_id
+            ]
+            agent_actions += [
+                {"action": "move", "actor_id": actor.id, "target": (20, 20)}
+                for actor in world.actors
+                if actor.owner_id == agent_id
+            ]
+            actions.append({"agent_id": agent_id, "actions": agent_actions})
+
+        world.state
+        world.update(actions)
+
+        assert list(world._foods_by_id.values()) == world.foods
+        assert list(world._actors_by_id.values()) == world.actors
+        assert list(world._bases_by_id.values()) == world.bases
+
+
+def test_get_by_id():
+    world = _make_world()
+    actor = world.actors[0]
+
+    assert world._get_actor(actor.id) is actor
+    assert world._get_actor("missing") is None
+    assert world._get_actor(["not", "hashable"]) is None
+    assert world._get_food(world.foods[0].id) is world.foods[0]
+    assert world._get_base(world.bases[0].id) is world.bases[0]
+
+
+def _own_actor(world, agent_id):
+    return next(actor for actor in world.actors if actor.owner_id == agent_id)
+
+
+def test_one_action_per_actor():
+    world = _make_world()
+    actor = _own_actor(world, "agent_0")
+    x, y = actor.position
+
+    world.update(
+        [
+            {
+                "agent_id": "agent_0",
+                "actions": [
+                    {"action": "move", "actor_id": actor.id, "target": (x + 1, y)},
+                    {"action": "move", "actor_id": actor.id, "target": (x, y + 1)},
+                ],
+            }
+        ]
+    )
+
+    assert actor.position == (x + 1, y)
+
+
+def test_actions_on_other_agents_entities_are_ignored():
+    world = _make_world()
+    actor = _own_actor(world, "agent_1")
+    base = next(base for base in world.bases if base.owner_id == "agent_1")
+    base.add_food(1000)
+    position = actor.position
+
+    world.update(
+        [
+            {
+                "agent_id": "agent_0",
+                "actions": [
+                    {"action": "move", "actor_id": actor.id, "target": (0, 0)},
+                    {"action": "spawn", "base_id": base.id},
+                ],
+            }
+        ]
+    )
+
+    assert actor.position == position
+    assert len(world.actors) == 2
+
+
+def test_malformed_actions_are_ignored():
+    world = _make_world()
+    actor = _own_actor(world, "agent_0")
+    position = actor.position
+
+    world.update(
+        [
+            {
+                "agent_id": "agent_0",
+                "actions": [
+                    "move",
+                    {"action": "fly", "actor_id": actor.id},
+                    {"action": "move", "actor_id": actor.id, "target": "up"},
+                    {"action": "move", "actor_id": actor.id, "target": (1, None)},
+                ],
+            },
+            {"agent_id": "agent_1", "actions": {"action": "move"}},
+        ]
+    )
+
+    assert actor.position == position
+
+
+def test_make_base():
+    class MakeBaseConfig(Config):
+        make_base_cost = 10
+
+    world = World(config=MakeBaseConfig)
+    world.register_agent(Seat("agent_0"))
+    actor = _own_actor(world, "agent_0")
+    actor.add_food(30)
+    position = actor.position
+
+    world.update(
+        [
+            {
+                "agent_id": "agent_0",
+                "actions": [{"action": "make_base", "actor_id": actor.id}],
+            }
+        ]
+    )
+
+    assert actor not in world.actors
+    base = world.bases[-1]
+    assert base.position == position
+    assert base.food == 20
+
+
+def test_attacks_land_together():
+    world = _make_world()
+    target = _own_actor(world, "agent_1")
+    attackers = [_own_actor(world, "agent_0")]
+    attackers += [world._spawn_actor("agent_0") for _ in range(2)]
+    for attacker in attackers:
+        attacker.position = target.position
+    health = target.health
+
+    world.update(
+        [
+            {
+                "agent_id": "agent_0",
+                "actions": [
+                    {"action": "attack", "actor_id": attacker.id, "target": target.id}
+                    for attacker in attackers
+                ],
+            }
+        ]
+    )
+
+    assert target.health == health - sum(attacker.damage for attacker in attackers)
+
+
+def test_state_does_not_change_the_world():
+    world = _make_world()
+    actor = _own_actor(world, "agent_0")
+    actor.kill()
+
+    state = world.state
+
+    assert world.state == state
+    assert actor in world.actors
+    assert world.dead_entities == []
+
+    world.update([])
+
+    assert actor not in world.actors
+    assert world.state["dead_entities"] == [actor.state]
+
+
+def test_dead_entities_are_reported_once():
+    world = _make_world()
+    actor = _own_actor(world, "agent_0")
+    actor.kill()
+
+    world.update([])
+    assert [entity["id"] for entity in world.state["dead_entities"]] == [actor.id]
+    assert "graveyard" not in world.state
+
+    world.update([])
+    assert world.state["dead_entities"] == []
+
+    world.update([{"agent_id": "agent_1", "actions": [], "graveyard": True}])
+    assert world.state["graveyard"] == [actor.state]
+
+    world.update([])
+    assert "graveyard" not in world.state
+
+
+def test_collision_deaths_are_reported():
+    world = _make_world()
+    actor1 = _own_actor(world, "agent_0")
+    actor2 = _own_actor(world, "agent_1")
+    actor2.position = actor1.position
+    world._actor_grid.update(actor2)
+
+    world.update([])
+
+    dead_ids = [entity["id"] for entity in world.state["dead_entities"]]
+    assert len(dead_ids) == 1
+    assert dead_ids[0] in (actor1.id, actor2.id)
+
+
+def test_agents_only_see_what_is_in_view():
+    class Config(FogOfWarConfig):
+        view_radius = 3
+
+    world = World(config=Config)
+    for agent_id in ["agent_0", "agent_1"]:
+        world.register_agent(Seat(agent_id))
+
+    state = world.state
+    assert "state_by_agent" in state
+
+    for agent_id, view in state["state_by_agent"].items():
+        observers = [
+            entity
+            for entity in world.actors + world.bases
+            if entity.owner_id == agent_id
+        ]
+        visible = {
+            entity.id
+            for entity in world.foods + world.actors + world.bases
+            if getattr(entity, "owner_id", None) == agent_id
+            or any(
+                object_distance(entity, observer) <= Config.view_radius
+                for observer in observers
+            )
+        }
+
+        seen = {
+            entity["id"] for key in ["foods", "actors", "bases"] for entity in view[key]
+        }
+        assert seen == visible
+        assert all(base["owner_id"] == agent_id for base in view["bases"])
+
+
+def test_view_grid_is_only_kept_with_a_view_radius():
+    world = _make_world()
+    world.update([])
+    assert world._view_grid is None
+    assert world.clone()._view_grid is None
+
+    world = World(config=FogOfWarConfig)
+    world.register_agent(Seat("agent_0"))
+    world.update([])
+    entities = world.foods + world.actors + world.bases
+    assert len(world._view_grid) == len(entities)
+    assert all(entity in world._view_grid for entity in entities)
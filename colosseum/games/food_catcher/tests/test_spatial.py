@@ -0,0 +1,83 @@
+import random
+
+from colosseum.utils import object_distance
+
+from ..actor import Actor
+from ..game import World
+from ..spatial import SpatialHash
+
+
+def _actor_at(position):
+    return Actor().set_position(position)
+
+
+def test_query_finds_nearby_entities():
+    near = _actor_at((1, 1))
+    far = _actor_at((30, 30))
+    grid = SpatialHash(2, [near, far])
+
+    assert set(grid.query((0.5, 0.5), 1)) == {near}
+    assert grid.within((0, 0), 1.5) == [near]
+    assert grid.within((0, 0), 1) == []
+
+
+def test_update_moves_entity_between_cells():
+    actor = _actor_at((1, 1))
+    grid = SpatialHash(2, [actor])
+
+    actor.set_position((10, 10))
+    grid.update(actor)
+
+    assert grid.within((1, 1), 1) == []
+    assert grid.within((10, 10), 1) == [actor]
+    assert len(grid) == 1
+
+
+def test_remove():
+    actor = _actor_at((-3, 5))
+    grid = SpatialHash(2, [actor])
+
+    grid.remove(actor)
+    grid.remove(actor)
+
+    assert actor not in grid
+    assert list(grid.query((-3, 5), 10)) == []
+
+
+def _brute_force_collisions(world):
+    actors = world.actors
+    for i in range(len(actors)):
+        actor1 = actors[i]
+        if actor1.dead:
+            continue
+
+        for j in range(i + 1, len(actors)):
+            actor2 = actors[j]
+            if actor2.dead:
+                continue
+
+            if object_distance(actor1, actor2) < world._actor_radius * 2:
+                if actor1.food < actor2.food:
+                    actor1.add_food(actor2.take_food())
+                    actor2.kill()
+                else:
+                    actor2.add_food(actor1.take_food())
+                    actor1.kill()
+
+
+def test_collisions_match_checking_every_pair():
+    random.seed(7)
+    world = World()
+
+    for _ in range(300):
+        position = (random.uniform(0, 40), random.uniform(0, 40))
+        actor = world._spawn_actor("foo", position)
+        actor.add_food(random.randint(0, 5))
+
+    expected = world.clone()
+    _brute_force_collisions(expected)
+    world._update_actors()
+
+    alive = [actor.state for actor in expected.actors if actor.alive]
+    assert [actor.state for actor in world.actors] == alive
+    assert len(alive) < 300
@@ -0,0 +1,151 @@
+import json
+
+import numpy as np
+
+from ..actor import Actor
+from ..base import Base
+from ..food import Food
+from ..store import EntityStore
+
+
+def test_rows_are_reused():
+    store = EntityStore(capacity=2)
+
+    row1 = store.allocate()
+    row2 = store.allocate()
+    assert len(store) == 2
+
+    store.release(row1)
+    assert len(store) == 1
+    assert store.allocate() == row1
+    assert row2 != row1
+
+
+def test_store_grows_and_keeps_rows():
+    store = EntityStore(capacity=1)
+    food = Food(store).set_position((1, 2)).set_quantity(3)
+
+    others = [Food(store) for _ in range(10)]
+
+    assert store.capacity >= 11
+    assert food.position == (1, 2)
+    assert food.quantity == 3
+    assert len({other._row for other in others + [food]}) == 11
+
+
+def test_entities_share_the_store():
+    store = EntityStore()
+    actor = Actor(store).set_position((1, 1)).set_owner("foo")
+    food = Food(store).set_position((2, 2))
+
+    assert store.positions[actor._row].tolist() == [1, 1]
+    assert store.positions[food._row].tolist() == [2, 2]
+    assert store.owner_ids[actor._row] == "foo"
+    assert store.ids[food._row] == food.id
+
+
+def test_detach_keeps_the_entity_state():
+    store = EntityStore()
+    actor = Actor(store).set_position((1, 1))
+    actor.add_food(5)
+    state = actor.state
+
+    row = actor._row
+    actor.detach()
+
+    assert actor.state == state
+    assert store.ids[row] is None
+    assert len(store) == 0
+
+
+def test_grow_quantity():
+    store = EntityStore()
+    foods = [Food(store).set_quantity(quantity) for quantity in [1, 10, 49]]
+
+    expected = []
+    for food in foods:
+        food_copy = Food().set_quantity(food.quantity)
+        food_copy.grow()
+        expected.append(food_copy.quantity)
+
+    store.grow_quantity([food._row for food in foods], Food.growth_rate, 50)
+
+    assert [food.quantity for food in foods] == expected
+
+
+def test_move_towards_matches_actor_move():
+    store = EntityStore()
+    starts = [(0, 0), (3, 4), (5, 5), (1, 1)]
+    targets = [(1, 0), (0, 0), (5, 5), (1.5, 1)]
+
+    actors = [Actor(store).set_position(start) for start in starts]
+    expected = []
+    for start, target in zip(starts, targets):
+        actor = Actor().set_position(start)
+        actor.move(target)
+        expected.append(actor.position)
+
+    store.move_towards([actor._row for actor in actors], targets, 1)
+
+    assert np.allclose([actor.position for actor in actors], expected)
+
+
+def test_state_is_rebuilt_only_when_dirty():
+    store = EntityStore()
+    foods = [Food(store).set_quantity(quantity) for quantity in [1, 50]]
+    states = [food.state for food in foods]
+
+    assert not store.dirty[[food._row for food in foods]].any()
+    assert [food.state for food in foods] == states
+    assert all(food.state is state for food, state in zip(foods, states))
+
+    # The full food does not grow, so only the first one needs a new state
+    store.grow_quantity([food._row for food in foods], Food.growth_rate, 50)
+
+    assert foods[0].state is not states[0]
+    assert foods[0].state["quantity"] == foods[0].quantity
+    assert foods[1].state is states[1]
+
+
+def test_setters_mark_rows_dirty():
+    store = EntityStore()
+    actor = Actor(store).set_position((1, 1))
+    actor.state
+
+    actor.position = (2, 2)
+    assert actor.state["position"] == (2, 2)
+
+    state = actor.state
+    store.subtract_health([actor._row, actor._row], [1, 2])
+    assert actor.state is not state
+    assert actor.state["health"] == state["health"] - 3
+
+
+def test_entities_only_hold_their_row():
+    store = EntityStore()
+
+    for entity in [Actor(store), Base(store), Food(store)]:
+        assert not hasattr(entity, "__dict__")
+
+
+def test_state_keeps_whole_numbers_as_ints():
+    store = EntityStore()
+    actor = Actor(store).set_position((1.5, 2)).set_owner("foo")
+    base = Base(store).set_position((3, 4)).set_owner("foo")
+    food = Food(store).set_position((5, 6)).set_quantity(50)
+
+    assert json.loads(json.dumps(actor.state)) == {
+        "position": [1.5, 2.0],
+        "id": actor.id,
+        "owner_id": "foo",
+        "food": 0,
+        "health": 50,
+        "max_health": 50,
+    }
+    assert '"food": 0,' in json.dumps(actor.state)
+    assert '"health": 50,' in json.dumps(actor.state)
+    assert '"food": 0, "health": 50,' in json.dumps(base.state)
+    assert '"quantity": 50,' in json.dumps(food.state)
+
+    actor.add_food(2.5)
+    assert actor.state["food"] == 2.5
@@ -1,9 +1,24 @@
+import copy
 import logging
 
 
+logger = logging.getLogger(__name__)
+
+
 # TODO: We have a bunch more of things to move here, like the
 # register agent method, outcome, etc
 class BaseGame:
+    # ISOLATED games where every agent plays a game of its own can set this,
+    # and implement ``agent_state``, ``update_agent`` and ``agent_finished``,
+    # to have each agent and its game played on a thread of its own
+    supports_pipelines = False
+
+    # The manager turns this off when the world state only gets read through
+    # the per agent views in ``state_by_agent``, e.g. when every agent gets
+    # its own view and the replay doesn't keep the state. Games can then skip
+    # building what nobody reads.
+    full_state_needed = True
+
     @property
     def initial_config(self):
         return self._config
@@ -21,9 +36,11 @@ class BaseGame:
 
     @property
     def config(self):
+        # Walks the mro, so that configs can subclass one another
         return {
             k: v
-            for k, v in dict(self._config.__dict__).items()
+            for klass in reversed(self._config.__mro__)
+            for k, v in vars(klass).items()
             if not k.startswith("_")
         }
 
@@ -46,15 +63,82 @@ class BaseGame:
     def update(self, agent_actions):
         raise NotImplementedError
 
+    def agent_state(self, agent_id):
+        raise NotImplementedError
+
+    def update_agent(self, agent_id, agent_action):
+        raise NotImplementedError
+
+    def agent_finished(self, agent_id):
+        raise NotImplementedError
+
+    def drop_tainted_agents(self):
+        """
+        Called by the manager once any agent gets tainted, which stops the
+        match for everyone unless this returns True. Games with more than two
+        players can take the tainted agents out of the game here and play on.
+        """
+        return False
+
+    def snapshot(self):
+        """
+        Returns an opaque snapshot of the current game state, which can be
+        given to ``restore`` any number of times to bring the game back to
+        it. Agents are only kept by id, so snapshots can be pickled, e.g. to
+        checkpoint a long match and resume it in another process.
+        """
+        state = {key: value for key, value in self.__dict__.items() if key != "agents"}
+        return self._copy_state(state)
+
+    def restore(self, snapshot, agents=None):
+        """
+        Brings the game back to ``snapshot``, played by ``agents``, which
+        default to the agents of the game. They are matched to the snapshot
+        by id.
+        """
+        agents = set(self.__dict__.get("agents", ()) if agents is None else agents)
+        agent_ids = {agent.id for agent in agents}
+        if agent_ids != snapshot["agent_ids"]:
+            raise ValueError(
+                f"snapshot was taken with agents {sorted(snapshot['agent_ids'])}, "
+                f"got {sorted(agent_ids)}"
+            )
+
+        self.__dict__.update(self._copy_state(snapshot))
+        self._attach_agents(agents)
+
+    def clone(self):
+        """
+        Returns an independent copy of the game, playing with the same agents.
+        """
+        game = self._detached_copy()
+        game._attach_agents(self.agents)
+        return game
+
+    def _detached_copy(self):
+        # Copies the state only once, unlike restoring a snapshot. The copy
+        # has no agents until they get attached.
+        game = self.__class__.__new__(self.__class__)
+        game.__dict__.update(self.snapshot())
+        return game
+
+    def _attach_agents(self, agents):
+        self.agents = set(agents)
+
+    def _copy_state(self, state):
+        # Generic fallback. Games should override it with something cheaper,
+        # copying only what can change during the game.
+        return copy.deepcopy(state)
+
     def _get_agent(self, id):
         return next((agent for agent in self.agents if agent.id == id), None)
 
     def register_agent(self, agent):
         if agent.id in self.agent_ids:
-            logging.warning(f"tried to register {agent.id} more than once")
+            logger.warning("tried to register %s more than once", agent.id)
             return
 
         self.agent_ids.add(agent.id)
         self.agents.add(agent)
 
-        logging.info(f"agent {agent.id} registered")
+        logger.info("agent %s registered", agent.id)
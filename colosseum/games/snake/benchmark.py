@@ -0,0 +1,129 @@
+"""
+Measures how many ticks per second the snake engine runs as the board and the
+number of snakes grow. Snakes are driven in-process by a simple bot that moves
+at random while avoiding walls and bodies, so only engine time is measured.
+
+    python -m colosseum.games.snake.benchmark --sizes 10 50 100 200 --snakes 2 4 8 16
+"""
+
+import argparse
+import itertools
+import logging
+import time
+from random import Random
+
+from ..vec_game import Seat
+from .config import FreeForAllConfig
+from .game import Game
+
+
+MOVES = {"up": (0, -1), "right": (1, 0), "down": (0, 1), "left": (-1, 0)}
+
+
+def make_config(size, n_snakes):
+    return type(
+        f"BenchmarkConfig{size}x{n_snakes}",
+        (FreeForAllConfig,),
+        {
+            "grid_width": size,
+            "grid_height": size,
+            "food_sources_to_spawn": max(5, size * size // 150),
+            "min_food_sources": max(1, size * size // 300),
+            "max_agents": None,
+        },
+    )
+
+
+def make_game(config, n_snakes):
+    game = Game(config=config)
+
+    for i in range(n_snakes):
+        game.register_agent(Seat(f"snake_{i}"))
+
+    return game
+
+
+def pick_moves(game, rng):
+    actions = []
+
+    for snake in game.snakes:
+        if snake.dead:
+            continue
+
+        x, y = snake.head
+        safe_moves = [
+            move
+            for move, (dx, dy) in MOVES.items()
+            if game._in_bounds(x + dx, y + dy) and not game._occupancy[x + dx, y + dy]
+        ]
+        move = rng.choice(safe_moves or list(MOVES))
+
+        actions.append({"agent_id": snake.agent_id, "move": move})
+
+    return actions
+
+
+def run(size, n_snakes, ticks, seed=0):
+    """
+    Plays ``ticks`` ticks on a ``size`` x ``size`` board with ``n_snakes``
+    snakes, starting a new game whenever one finishes. Returns the ticks per
+    second of ``update`` alone, and of ``update`` plus building the state.
+    """
+    rng = Random(seed)
+    config = make_config(size, n_snakes)
+    game = make_game(config, n_snakes)
+
+    update_time = 0
+    state_time = 0
+    games = 1
+
+    for _ in range(ticks):
+        if game.finished:
+            game = make_game(config, n_snakes)
+            games += 1
+
+        actions = pick_moves(game, rng)
+
+        start = time.perf_counter()
+        game.update(actions)
+        update_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        game.state
+        state_time += time.perf_counter() - start
+
+    return {
+        "size": size,
+        "snakes": n_snakes,
+        "ticks": ticks,
+        "games": games,
+        "update_tps": ticks / update_time,
+        "total_tps": ticks / (update_time + state_time),
+    }
+
+
+def main(sizes, snakes, ticks, seed):
+    print(
+        f"{'board':>9} {'snakes':>6} {'games':>5} {'update t/s':>11} {'+state t/s':>11}"
+    )
+
+    for size, n_snakes in itertools.product(sizes, snakes):
+        result = run(size, n_snakes, ticks, seed=seed)
+        print(
+            f"{size:>4}x{size:<4} {n_snakes:>6} {result['games']:>5} "
+            f"{result['update_tps']:>11.0f} {result['total_tps']:>11.0f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the snake engine")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10, 50, 100, 200])
+    parser.add_argument("--snakes", nargs="+", type=int, default=[2, 4, 8, 16])
+    parser.add_argument("--ticks", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # Collisions are logged as warnings, which would only add noise here
+    logging.disable(logging.WARNING)
+
+    main(args.sizes, args.snakes, args.ticks, args.seed)
@@ -12,6 +12,41 @@ class Config:
     min_food_sources = 1
     n_epochs = 1000
 
+    # At most this many snakes can join, None for no limit
+    max_agents = None
+    # Where snakes start, as (x, y) fractions of the board size. Each snake
+    # gets a random free slot, or a random spot when there are none.
+    start_slots = []
+    # What happens when heads meet on a cell with nothing else on it. Either
+    # BOTH_DIE, or LONGEST_SURVIVES where only a strictly longest snake lives.
+    head_to_head_rule = "BOTH_DIE"
+    # How grid rows are sent in the state. ROWS has a character for each cell,
+    # RLE prefixes runs of the same character with their length, e.g. "7 C>>@"
+    grid_encoding = "ROWS"
+
     # Time settings
     step_time_limit = ONE_SECOND * 2
     step_limit_pool = ONE_SECOND * 20
+
+
+class FreeForAllConfig(Config):
+    game_name = "snake_ffa"
+
+    grid_width = 100
+    grid_height = 100
+    food_sources_to_spawn = 64
+    min_food_sources = 32
+    n_epochs = 2000
+
+    max_agents = 16
+    # A 4x4 lattice, with the same room around every slot
+    start_slots = [
+        ((2 * i + 1) / 8, (2 * j + 1) / 8) for i in range(4) for j in range(4)
+    ]
+    head_to_head_rule = "LONGEST_SURVIVES"
+    # Most of a big board is empty, which run-length encoding sends in a few
+    # characters per row
+    grid_encoding = "RLE"
+
+    step_time_limit = ONE_SECOND
+    step_limit_pool = ONE_SECOND * 10
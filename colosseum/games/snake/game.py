@@ -1,10 +1,12 @@
+import copy
 import itertools
 import logging
-from collections import defaultdict
+from collections import defaultdict, deque
 from enum import Enum
-from random import choice, randint, shuffle, uniform
+from random import choice, shuffle, uniform
 
 import chess
+import numpy as np
 
 from colosseum.utils import random_id
 
@@ -12,6 +14,9 @@ from ..game import BaseGame
 from .config import Config
 
 
+logger = logging.getLogger(__name__)
+
+
 class Direction(Enum):
     UP = 1
     RIGHT = 2
@@ -32,11 +37,14 @@ class Direction(Enum):
 
 
 class Game(BaseGame):
-    def __init__(self):
+    def __init__(self, config=None):
+        if not config:
+            config = Config
+
         self.agents = set()
         self.agent_ids = set()
 
-        self._config = Config
+        self._config = config
         self.name = self._config.game_name
         self.grid_width = self._config.grid_width
         self.grid_height = self._config.grid_height
@@ -45,27 +53,60 @@ class Game(BaseGame):
         self.snakes_by_id = {}
         self.snakes_score = defaultdict(int)
         self.foods = []
+        self._foods_by_position = {}
+
+        # How many snake segments are on each cell, indexed by [x, y]. It is
+        # kept up to date as snakes move, grow and die.
+        self._occupancy = np.zeros((self.grid_width, self.grid_height), dtype=np.int32)
+        # Cells with neither snakes nor food, to spawn things on
+        self._free_cells = FreeCells(
+            (x, y) for x in range(self.grid_width) for y in range(self.grid_height)
+        )
+
+        # The grid sent in the state, one glyph byte per cell, row by row. It
+        # is redrawn only on the cells that changed since it was last sent,
+        # or in full after a snake dies, and only changed rows are encoded.
+        self._grid = bytearray(b" " * (self.grid_width * self.grid_height))
+        self._grid_rows = [""] * self.grid_height
+        self._grid_changed_cells = set()
+        self._grid_changed_rows = set(range(self.grid_height))
+        self._grid_redraw = True
+        self._grid_directions = {}
+        self._grid_state_cache = None
 
         self._tick = 0
 
+        self._start_slots = [
+            (int(x * self.grid_width), int(y * self.grid_height))
+            for x, y in self._config.start_slots
+        ]
+        shuffle(self._start_slots)
+
         self._update_food_spawning()
 
-        logging.info("snake initialized")
+        logger.info("snake initialized")
 
     def register_agent(self, agent):
+        max_agents = self._config.max_agents
+        if max_agents is not None and len(self.snakes) >= max_agents:
+            raise ValueError(f"{self.name} supports at most {max_agents} agents")
+
         super().register_agent(agent)
 
         snake = self._spawn_snake(agent.id)
         self.snakes.append(snake)
         self.snakes_by_id[agent.id] = snake
 
+        for position in snake.body:
+            self._occupy(position, 1)
+
     @property
     def state(self):
         return {
             "score": self.scores,
             "snakes": self._snake_states,
             "foods": self._food_state,
-            "grid": self._grid_state_str,
+            "grid": self._grid_state,
         }
 
     @property
@@ -75,8 +116,8 @@ class Game(BaseGame):
         for snake in self.snakes:
             state = {}
             state["alive"] = snake.alive
-            state["head_position"] = snake.position.as_list
-            state["positions"] = [p.as_list for p in snake.positions]
+            state["head_position"] = list(snake.head)
+            state["positions"] = [list(position) for position in snake.body]
 
             states[snake.agent_id] = state
 
@@ -88,47 +129,93 @@ class Game(BaseGame):
 
     @property
     def _grid_state(self):
-        base_grid = []
-        for _ in range(self.grid_width):
-            row = []
-            for _ in range(self.grid_height):
-                row.append(Cell())
+        if self._grid_state_cache is None:
+            self._draw_grid()
+            self._grid_state_cache = self._encode_grid()
 
-            base_grid.append(row)
+        return self._grid_state_cache
 
-        for snake in self.snakes:
-            if snake.dead:
+    def _encode_grid(self):
+        if self._config.grid_encoding == "RLE":
+            encode_row = _run_length_encode
+        else:
+            encode_row = bytes.decode
+
+        width = self.grid_width
+        for y in self._grid_changed_rows:
+            self._grid_rows[y] = encode_row(
+                bytes(self._grid[y * width : (y + 1) * width])
+            )
+        self._grid_changed_rows = set()
+
+        return {
+            "width": self.grid_width,
+            "height": self.grid_height,
+            "encoding": self._config.grid_encoding,
+            "grid_string": list(self._grid_rows),
+        }
+
+    def _draw_grid(self):
+        if self._grid_redraw:
+            self._grid[:] = b" " * len(self._grid)
+            self._grid_changed_rows = set(range(self.grid_height))
+            self._grid_changed_cells = set(self._foods_by_position)
+            self._grid_changed_cells.update(
+                map(tuple, np.argwhere(self._occupancy > 1).tolist())
+            )
+            self._grid_directions = {}
+            self._grid_redraw = False
+
+        # Cells that emptied, filled up with food or collided can be drawn
+        # right away. Those with a single segment are drawn with their snake.
+        for x, y in self._grid_changed_cells:
+            if (x, y) in self._foods_by_position:
+                glyph = _FOOD_GLYPH
+            elif self._occupancy[x, y] == 0:
+                glyph = _EMPTY_GLYPH
+            elif self._occupancy[x, y] > 1:
+                glyph = _COLLISION_GLYPH
+            else:
                 continue
 
-            while True:
-                x, y = snake.position
-                base_grid[x][y].occupy(snake)
-                snake = snake.next_cell
+            self._set_grid_cell(x, y, glyph)
 
-                if not snake:
-                    break
+        self._grid_changed_cells = set()
 
-        for food in self.foods:
-            x, y = food.position
-            base_grid[x][y].occupy(food)
+        for snake in self.snakes:
+            if snake.alive:
+                self._draw_snake(snake)
 
-        return base_grid
+    def _draw_snake(self, snake):
+        body_glyph = ord(snake.body_glyph)
 
-    @property
-    def _grid_state_str(self):
-        data = {"width": self.grid_width, "height": self.grid_height}
-        rows = []
+        # The whole body points the way the head last moved, so a turn
+        # redraws all of it. Otherwise only the ends have changed.
+        if self._grid_directions.get(snake.agent_id, False) != snake.direction:
+            self._grid_directions[snake.agent_id] = snake.direction
+            cells = enumerate(snake.body)
+        else:
+            cells = [(0, snake.body[0]), (1, snake.body[1]), (-1, snake.tail)]
 
-        for y in range(self.grid_height):
-            row = []
-            for x in range(self.grid_width):
-                row.append(self._grid_state[x][y].to_string)
+        for i, (x, y) in cells:
+            if not self._in_bounds(x, y) or self._occupancy[x, y] != 1:
+                continue
 
-            rows.append("".join(row))
+            if i == 0:
+                glyph = _HEAD_GLYPH
+            elif i in (-1, len(snake) - 1) and snake.grown:
+                # Segments only get a direction once they have moved
+                glyph = _GROWN_TAIL_GLYPH
+            else:
+                glyph = body_glyph
 
-        data["grid_string"] = rows
+            self._set_grid_cell(x, y, glyph)
 
-        return data
+    def _set_grid_cell(self, x, y, glyph):
+        index = y * self.grid_width + x
+        if self._grid[index] != glyph:
+            self._grid[index] = glyph
+            self._grid_changed_rows.add(y)
 
     @property
     def outcome(self):
@@ -165,9 +252,27 @@ class Game(BaseGame):
         return (
             self._tick >= self._config.n_epochs
             or self._snake_alive_count == 0
-            or len(self.tainted_agents) >= 2
+            or len(self.tainted_agents) == len(self.agents)
         )
 
+    def drop_tainted_agents(self):
+        # Free-for-alls play on without the tainted snakes, as long as at least
+        # two others are still alive to play against each other
+        tainted_agent_ids = {agent.id for agent in self.tainted_agents}
+        survivors = [
+            snake
+            for snake in self.snakes
+            if snake.alive and snake.agent_id not in tainted_agent_ids
+        ]
+        if len(survivors) < 2:
+            return False
+
+        for snake in self.snakes:
+            if snake.alive and snake.agent_id in tainted_agent_ids:
+                self._kill_snake(snake)
+
+        return True
+
     def update(self, agent_actions):
         self._tick += 1
 
@@ -182,12 +287,16 @@ class Game(BaseGame):
     def _process_agent_action(self, agent_action):
         agent_id = agent_action.get("agent_id")
         if agent_id not in self.agent_ids:
-            logging.warning(f"agent with id {agent_id} is not registered. Ignoring")
+            logger.warning("agent with id %s is not registered. Ignoring", agent_id)
             return
 
         move_direction_str = agent_action.get("move")
         if not move_direction_str:
-            logging.warning(f"got null move from {agent_action=} from {agent_id=}")
+            logger.warning(
+                "got null move from agent_action=%s from agent_id=%s",
+                agent_action,
+                agent_id,
+            )
             return
 
         snake = self.snakes_by_id[agent_id]
@@ -196,49 +305,110 @@ class Game(BaseGame):
             return
 
         move_direction = Direction.from_string(move_direction_str)
-        snake.update(move_direction)
+        self._move_snake(snake, move_direction)
+
+    def _move_snake(self, snake, direction):
+        tail = snake.tail
+        length = len(snake)
+
+        snake.update(direction)
+
+        # Only the cells the head entered and the tail left have changed
+        self._occupy(snake.head, 1)
+        if len(snake) == length:
+            self._occupy(tail, -1)
+
+    def _kill_snake(self, snake):
+        snake.die()
+        self._grid_redraw = True
+        self._grid_state_cache = None
+
+        for position in snake.body:
+            self._occupy(position, -1)
+
+    def _occupy(self, position, amount):
+        x, y = position
+        if not self._in_bounds(x, y):
+            return
+
+        self._occupancy[x, y] += amount
+        self._grid_changed_cells.add((x, y))
+        self._grid_state_cache = None
+
+        if self._occupancy[x, y] > 0:
+            self._free_cells.discard((x, y))
+        elif (x, y) not in self._foods_by_position:
+            self._free_cells.add((x, y))
+
+    def _in_bounds(self, x, y):
+        return 0 <= x < self.grid_width and 0 <= y < self.grid_height
 
     def _update_collision(self):
-        grid = self._grid_state
+        # Bodies follow the cells their heads left, so a cell can only have
+        # more than one segment if a head just moved into it. Everything is
+        # checked before anyone is removed, since collisions happen at once.
+        heads = defaultdict(list)
+        for snake in self.snakes:
+            if snake.alive:
+                heads[snake.head].append(snake)
+
+        colliding = []
+        for (x, y), snakes in heads.items():
+            if self._occupancy[x, y] <= 1:
+                continue
 
-        for y in range(self.grid_height):
-            for x in range(self.grid_width):
-                if grid[x][y].contains_multiple_snakes:
-                    snakes = grid[x][y].occupying_snakes
-                    logging.warning(f"found multiple snakes at cell {x=} {y=}")
-                    for snake in snakes:
-                        snake.die()
+            logger.warning("found multiple snakes at cell x=%s y=%s", x, y)
+
+            if self._occupancy[x, y] == len(snakes):
+                colliding.extend(self._head_to_head_losers(snakes))
+            else:
+                colliding.extend(snakes)
+
+        for snake in colliding:
+            self._kill_snake(snake)
+
+    def _head_to_head_losers(self, snakes):
+        if self._config.head_to_head_rule == "LONGEST_SURVIVES":
+            longest = max(len(snake) for snake in snakes)
+            survivors = [snake for snake in snakes if len(snake) == longest]
+            if len(survivors) == 1:
+                return [snake for snake in snakes if snake is not survivors[0]]
+
+        return snakes
 
     def _update_food_spawning(self):
         if len(self.foods) >= self._config.min_food_sources:
             return
 
-        grid = self._grid_state
-
-        logging.info(
-            f"spawning {self._config.food_sources_to_spawn - len(self.foods)} foods"
+        logger.info(
+            "spawning %s foods", self._config.food_sources_to_spawn - len(self.foods)
         )
         for _ in range(self._config.food_sources_to_spawn - len(self.foods)):
-            position = Vector(
-                randint(0, self.grid_width - 1), randint(0, self.grid_height - 1)
-            )
+            if not self._free_cells:
+                break
 
-            # TODO: Ensure we spawn a food piece if there is an empty cell available
-            if grid[position.x][position.y].empty:
-                self.foods.append(Food(position))
+            x, y = self._free_cells.sample()
+            self._free_cells.discard((x, y))
+            self._grid_changed_cells.add((x, y))
+            self._grid_state_cache = None
+
+            food = Food(Vector(x, y))
+            self.foods.append(food)
+            self._foods_by_position[(x, y)] = food
 
     def _update_eaten_food(self):
-        grid = self._grid_state
+        for (x, y), food in list(self._foods_by_position.items()):
+            if self._occupancy[x, y] == 0:
+                continue
 
-        for y in range(self.grid_height):
-            for x in range(self.grid_width):
-                if grid[x][y].contains_snake and grid[x][y].contains_food:
-                    snake = grid[x][y].occupying_snakes[0]
-                    food = grid[x][y].occupying_foods[0]
+            snake = next(
+                snake for snake in self.snakes if snake.alive and (x, y) in snake.body
+            )
 
-                    snake.eat()
-                    food.eat()
-                    self.snakes_score[snake.agent_id] += 1
+            snake.eat()
+            food.eat()
+            self.snakes_score[snake.agent_id] += 1
+            del self._foods_by_position[(x, y)]
 
         self.foods = [x for x in self.foods if not x.eaten]
 
@@ -247,118 +417,200 @@ class Game(BaseGame):
             if snake.dead:
                 continue
 
-            if snake.position.x < 0 or snake.position.x >= self.grid_width:
-                snake.die()
+            if not self._in_bounds(*snake.head):
+                self._kill_snake(snake)
+
+    def _copy_state(self, state):
+        snakes = [snake.clone() for snake in state["snakes"]]
+        foods = [food.clone() for food in state["foods"]]
 
-            if snake.position.y < 0 or snake.position.y >= self.grid_height:
-                snake.die()
+        return {
+            **state,
+            "agent_ids": set(state["agent_ids"]),
+            "snakes": snakes,
+            "snakes_by_id": {snake.agent_id: snake for snake in snakes},
+            "snakes_score": copy.copy(state["snakes_score"]),
+            "foods": foods,
+            "_foods_by_position": {tuple(food.position): food for food in foods},
+            "_occupancy": state["_occupancy"].copy(),
+            "_free_cells": state["_free_cells"].copy(),
+            "_start_slots": list(state["_start_slots"]),
+            "_grid": bytearray(state["_grid"]),
+            "_grid_rows": list(state["_grid_rows"]),
+            "_grid_changed_cells": set(state["_grid_changed_cells"]),
+            "_grid_changed_rows": set(state["_grid_changed_rows"]),
+            "_grid_directions": dict(state["_grid_directions"]),
+        }
 
     @property
     def _snake_alive_count(self):
         return len([snake for snake in self.snakes if snake.alive])
 
     def _spawn_snake(self, agent_id):
-        # TODO: We should make sure we do not generate invalid
-        # starting positions, like OOB, instant game over, overlapping
-        # with itself or other snakes, over obstacles or food.
-        starting_position = Vector(
-            randint(0, self.grid_width - 1), randint(0, self.grid_height - 1)
-        )
-        tail_position = starting_position.clone()
-        tail_position.x -= 1
-        snake = Snake(agent_id, position=starting_position, head=True)
-        snake_tail = Snake(agent_id, position=tail_position)
-        snake_tail.size = 1
+        # Snakes start with their tail to the left of the head, so both cells
+        # have to be free. Random picks are nearly always good, and only on
+        # crowded boards do we fall back to looking through every free cell.
+        free_cells = self._free_cells
 
-        snake.next_cell = snake_tail
-        snake.next_cell_direction = Direction.LEFT
+        while self._start_slots:
+            x, y = self._start_slots.pop()
+            if (x, y) in free_cells and (x - 1, y) in free_cells:
+                return Snake(agent_id, [(x, y), (x - 1, y)])
 
-        return snake
+        for _ in range(_SPAWN_ATTEMPTS):
+            if not free_cells:
+                break
+
+            x, y = free_cells.sample()
+            if (x - 1, y) in free_cells:
+                return Snake(agent_id, [(x, y), (x - 1, y)])
+
+        heads = [(x, y) for x, y in free_cells if (x - 1, y) in free_cells]
+        if not heads:
+            raise ValueError(f"no room left to spawn a snake for {agent_id}")
+
+        x, y = choice(heads)
+        return Snake(agent_id, [(x, y), (x - 1, y)])
+
+
+def _run_length_encode(row):
+    # Runs of more than one cell are prefixed with their length, e.g.
+    # "7 C>>@" for seven empty cells, a head, two body segments and a food
+    runs = []
+    for glyph, run in itertools.groupby(row.decode()):
+        length = len(list(run))
+        runs.append(f"{length}{glyph}" if length > 1 else glyph)
+
+    return "".join(runs)
 
 
 class Snake:
-    def __init__(self, agent_id, position=None, head=False):
+    """
+    A snake's body is kept as a deque of (x, y) cells, head first. Moving
+    pushes the new head and pops the tail, unless the snake is growing.
+    """
+
+    __slots__ = ("agent_id", "body", "direction", "alive", "grow", "grown")
+
+    def __init__(self, agent_id, body):
         self.agent_id = agent_id
-        self.size = 2
-        # FIXME: We need a proper API
-        self.next_cell_direction = None
-        self.next_cell = None
-        self.is_head = head
-        self.position = position
+        self.body = deque(body)
+        # Last direction the head moved in, None until the first move
+        self.direction = None
         self.alive = True
+        # Whether to grow on the next move, and whether the last move grew
         self.grow = False
+        self.grown = False
+
+    def __len__(self):
+        return len(self.body)
 
     @property
     def dead(self):
         return not self.alive
 
+    @property
+    def head(self):
+        return self.body[0]
+
+    @property
+    def tail(self):
+        return self.body[-1]
+
+    @property
+    def position(self):
+        return Vector(*self.head)
+
+    @property
+    def positions(self):
+        return [Vector(x, y) for x, y in self.body]
+
+    def clone(self):
+        snake = copy.copy(self)
+        snake.body = deque(self.body)
+        return snake
+
     def eat(self):
-        if self.size > 1:
-            self.next_cell.eat()
-        else:
-            self.grow = True
+        self.grow = True
 
     def die(self):
-        if self.next_cell:
-            self.next_cell.die()
-
         self.alive = False
 
     def update(self, direction):
-        if not self.is_head:
-            raise TypeError("update can only be called at the snake's head")
-
-        self._update(direction)
-
-    def _update(self, direction, new_position=None):
-        old_position = self.position.clone()
-
-        match direction:
-            case Direction.UP:
-                self.next_cell_direction = Direction.DOWN
-            case Direction.RIGHT:
-                self.next_cell_direction = Direction.LEFT
-            case Direction.DOWN:
-                self.next_cell_direction = Direction.UP
-            case Direction.LEFT:
-                self.next_cell_direction = Direction.RIGHT
-
-        if new_position is None:
-            match direction:
-                case Direction.UP:
-                    self.position.y -= 1
-                case Direction.RIGHT:
-                    self.position.x += 1
-                case Direction.DOWN:
-                    self.position.y += 1
-                case Direction.LEFT:
-                    self.position.x -= 1
-        else:
-            self.position = new_position.clone()
-
-        # This grow logic is a mini pile of goo
-        if self.size > 1:
-            self.next_cell._update(direction, new_position=old_position)
-        elif self.grow:
-            self.next_cell = Snake(self.agent_id, position=old_position)
-            self.next_cell.size = 1
-            self.size += 1
-            self.grow = False
+        x, y = self.head
+        dx, dy = _DIRECTION_DELTAS[direction]
+
+        self.body.appendleft((x + dx, y + dy))
+        self.direction = direction
 
         if self.grow:
-            self.size += 1
+            self.grow = False
+            self.grown = True
+        else:
+            self.body.pop()
+            self.grown = False
 
     @property
-    def positions(self):
-        p = [self.position]
+    def body_glyph(self):
+        # Every segment points back towards the head, as the head last moved
+        return _BODY_GLYPHS.get(self.direction, "S")
+
+
+class FreeCells:
+    """
+    Set of cells that can also be sampled from in constant time. Cells are
+    kept in a list, along with the index of each one in it, so that removing
+    a cell just moves the last one into its place.
+    """
+
+    __slots__ = ("_cells", "_indexes")
+
+    def __init__(self, cells=()):
+        self._cells = []
+        self._indexes = {}
+
+        for cell in cells:
+            self.add(cell)
+
+    def __len__(self):
+        return len(self._cells)
+
+    def __contains__(self, cell):
+        return cell in self._indexes
+
+    def __iter__(self):
+        return iter(self._cells)
+
+    def add(self, cell):
+        if cell in self._indexes:
+            return
+
+        self._indexes[cell] = len(self._cells)
+        self._cells.append(cell)
+
+    def discard(self, cell):
+        index = self._indexes.pop(cell, None)
+        if index is None:
+            return
 
-        if self.size > 1:
-            p.extend(self.next_cell.positions)
+        last_cell = self._cells.pop()
+        if index < len(self._cells):
+            self._cells[index] = last_cell
+            self._indexes[last_cell] = index
 
-        return p
+    def sample(self):
+        return choice(self._cells)
+
+    def copy(self):
+        free_cells = FreeCells()
+        free_cells._cells = list(self._cells)
+        free_cells._indexes = dict(self._indexes)
+        return free_cells
 
 
 class Food:
+    __slots__ = ("position", "eaten")
+
     def __init__(self, position):
         self.position = position
         self.eaten = False
@@ -366,8 +618,15 @@ class Food:
     def eat(self):
         self.eaten = True
 
+    def clone(self):
+        food = Food(self.position.clone())
+        food.eaten = self.eaten
+        return food
+
 
 class Vector:
+    __slots__ = ("x", "y")
+
     def __init__(self, x=0, y=0):
         self.x = x
         self.y = y
@@ -383,69 +642,24 @@ class Vector:
         return [self.x, self.y]
 
 
-class Cell:
-    def __init__(self):
-        self.occupied_by = []
-
-    def occupy(self, thing):
-        self.occupied_by.append(thing)
-
-    @property
-    def occupied(self):
-        return bool(self.occupied_by)
-
-    @property
-    def empty(self):
-        return not self.occupied
-
-    @property
-    def occupied_count(self):
-        return len(self.occupied_by)
-
-    @property
-    def occupying_foods(self):
-        return [x for x in self.occupied_by if isinstance(x, Food)]
-
-    @property
-    def contains_food(self):
-        return len(self.occupying_foods) > 0
-
-    @property
-    def occupying_snakes(self):
-        return [x for x in self.occupied_by if isinstance(x, Snake)]
-
-    @property
-    def contains_snake(self):
-        return len(self.occupying_snakes) > 0
-
-    @property
-    def contains_multiple_snakes(self):
-        return len(self.occupying_snakes) > 1
-
-    @property
-    def to_string(self):
-        if not self.occupied:
-            return " "
-
-        if self.contains_food:
-            return "@"
-
-        if self.occupied_count > 1:
-            return "X"
-
-        occupee = self.occupied_by[0]
+_SPAWN_ATTEMPTS = 100
 
-        if occupee.is_head:
-            return "C"
+_DIRECTION_DELTAS = {
+    Direction.UP: (0, -1),
+    Direction.RIGHT: (1, 0),
+    Direction.DOWN: (0, 1),
+    Direction.LEFT: (-1, 0),
+}
 
-        match occupee.next_cell_direction:
-            case Direction.DOWN:
-                return "^"
-            case Direction.UP:
-                return "V"
-            case Direction.RIGHT:
-                return "<"
-            case Direction.LEFT:
-                return ">"
+_EMPTY_GLYPH = ord(" ")
+_FOOD_GLYPH = ord("@")
+_HEAD_GLYPH = ord("C")
+_GROWN_TAIL_GLYPH = ord("S")
+_COLLISION_GLYPH = ord("X")
 
-        return "S"
+_BODY_GLYPHS = {
+    Direction.UP: "^",
+    Direction.DOWN: "V",
+    Direction.LEFT: "<",
+    Direction.RIGHT: ">",
+}
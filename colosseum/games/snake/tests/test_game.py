@@ -0,0 +1,284 @@
+import random
+
+import numpy as np
+import pytest
+
+from ...vec_game import Seat
+from .. import benchmark
+from ..config import FreeForAllConfig
+from ..game import Direction, FreeCells, Game, Snake, _run_length_encode
+
+
+def _make_game(n_agents=2):
+    game = Game()
+    for i in range(n_agents):
+        game.register_agent(Seat(f"agent_{i}"))
+    return game
+
+
+def _count_segments(game):
+    occupancy = np.zeros_like(game._occupancy)
+
+    for snake in game.snakes:
+        if snake.dead:
+            continue
+
+        for x, y in snake.positions:
+            if game._in_bounds(x, y):
+                occupancy[x, y] += 1
+
+    return occupancy
+
+
+def test_occupancy_follows_snakes():
+    random.seed(7)
+
+    for _ in range(20):
+        game = _make_game(n_agents=3)
+
+        while not game.finished:
+            game.update(
+                [
+                    {"agent_id": agent_id, "move": random.choice(["up", "left"])}
+                    for agent_id in game.agent_ids
+                ]
+            )
+
+            assert (game._occupancy == _count_segments(game)).all()
+
+
+def test_head_on_collision_kills_both(monkeypatch):
+    game = Game()
+
+    bodies = iter([[(3, 5), (2, 5)], [(5, 5), (6, 5)]])
+    monkeypatch.setattr(
+        game, "_spawn_snake", lambda agent_id: Snake(agent_id, next(bodies))
+    )
+    for agent_id in ["agent_0", "agent_1"]:
+        game.register_agent(Seat(agent_id))
+
+    snake1, snake2 = game.snakes
+    game.update(
+        [
+            {"agent_id": snake1.agent_id, "move": "right"},
+            {"agent_id": snake2.agent_id, "move": "left"},
+        ]
+    )
+
+    assert snake1.dead and snake2.dead
+    assert not game._occupancy.any()
+
+
+def test_snake_moves_and_grows():
+    snake = Snake("foo", [(2, 2), (1, 2)])
+    assert snake.body_glyph == "S"
+
+    snake.update(Direction.RIGHT)
+    assert list(snake.body) == [(3, 2), (2, 2)]
+    assert snake.body_glyph == ">"
+
+    snake.eat()
+    snake.update(Direction.DOWN)
+    assert list(snake.body) == [(3, 3), (3, 2), (2, 2)]
+    assert snake.grown
+
+    snake.update(Direction.DOWN)
+    assert list(snake.body) == [(3, 4), (3, 3), (3, 2)]
+    assert not snake.grown
+
+
+def test_long_snakes():
+    snake = Snake("foo", [(x, 0) for x in range(100000, 0, -1)])
+
+    snake.update(Direction.RIGHT)
+    clone = snake.clone()
+    clone.update(Direction.DOWN)
+
+    assert snake.head == (100001, 0)
+    assert clone.head == (100001, 1)
+    assert len(snake.positions) == len(clone) == 100000
+
+
+def test_free_cells():
+    free_cells = FreeCells([(0, 0), (0, 1), (1, 0)])
+
+    free_cells.discard((0, 0))
+    free_cells.discard((5, 5))
+    free_cells.add((0, 1))
+
+    assert len(free_cells) == 2
+    assert set(free_cells) == {(0, 1), (1, 0)}
+    assert (0, 0) not in free_cells
+    assert free_cells.sample() in {(0, 1), (1, 0)}
+
+
+def test_free_cells_follow_the_board():
+    random.seed(3)
+
+    for _ in range(20):
+        game = _make_game(n_agents=3)
+
+        while not game.finished:
+            occupied = {
+                (x, y)
+                for x in range(game.grid_width)
+                for y in range(game.grid_height)
+                if game._occupancy[x, y] or (x, y) in game._foods_by_position
+            }
+            assert set(game._free_cells).isdisjoint(occupied)
+            assert len(game._free_cells) + len(occupied) == game._occupancy.size
+
+            game.update(
+                [
+                    {"agent_id": agent_id, "move": random.choice(["down", "right"])}
+                    for agent_id in game.agent_ids
+                ]
+            )
+
+
+def test_snakes_spawn_on_free_cells():
+    for _ in range(50):
+        game = _make_game(n_agents=4)
+
+        cells = [cell for snake in game.snakes for cell in snake.body]
+        assert len(set(cells)) == len(cells)
+        assert all(game._in_bounds(x, y) for x, y in cells)
+        assert not set(cells) & set(game._foods_by_position)
+
+
+def test_food_spawns_while_there_is_room():
+    for _ in range(50):
+        game = Game()
+        assert len(game._foods_by_position) == game._config.food_sources_to_spawn
+
+    game._free_cells = FreeCells([(0, 0)])
+    game.foods = []
+    game._foods_by_position = {}
+    game._update_food_spawning()
+
+    assert [food.position.as_list for food in game.foods] == [[0, 0]]
+
+
+def test_free_for_all_start_slots():
+    # Food could land on a slot, which then goes unused
+    random.seed(0)
+
+    game = Game(config=FreeForAllConfig)
+    for i in range(FreeForAllConfig.max_agents):
+        game.register_agent(Seat(f"agent_{i}"))
+
+    slots = {
+        (int(x * game.grid_width), int(y * game.grid_height))
+        for x, y in FreeForAllConfig.start_slots
+    }
+    assert {snake.head for snake in game.snakes} == slots
+
+    with pytest.raises(ValueError):
+        game.register_agent(Seat("one_too_many"))
+
+
+def test_tainted_snakes_are_dropped_while_others_play_on():
+    game = _make_game(n_agents=3)
+    agents = {agent.id: agent for agent in game.agents}
+
+    agents["agent_0"].tainted = True
+    assert game.drop_tainted_agents()
+    assert game.snakes_by_id["agent_0"].dead
+    assert not game.finished
+
+    # Only one snake would be left to play
+    agents["agent_1"].tainted = True
+    assert not game.drop_tainted_agents()
+    assert game.snakes_by_id["agent_1"].alive
+
+
+@pytest.mark.parametrize(
+    "rule, lengths, survivors",
+    [
+        ("BOTH_DIE", [3, 2], []),
+        ("LONGEST_SURVIVES", [3, 2], [0]),
+        ("LONGEST_SURVIVES", [2, 2], []),
+    ],
+)
+def test_head_to_head_rules(monkeypatch, rule, lengths, survivors):
+    class Config(FreeForAllConfig):
+        head_to_head_rule = rule
+
+    game = Game(config=Config)
+
+    # Heads facing each other, one cell apart, bodies trailing away
+    bodies = iter(
+        [
+            [(10 - i, 5) for i in range(lengths[0])],
+            [(12 + i, 5) for i in range(lengths[1])],
+        ]
+    )
+    monkeypatch.setattr(
+        game, "_spawn_snake", lambda agent_id: Snake(agent_id, next(bodies))
+    )
+    for agent_id in ["agent_0", "agent_1"]:
+        game.register_agent(Seat(agent_id))
+
+    snake1, snake2 = game.snakes
+    game.update(
+        [
+            {"agent_id": snake1.agent_id, "move": "right"},
+            {"agent_id": snake2.agent_id, "move": "left"},
+        ]
+    )
+
+    assert [i for i, snake in enumerate(game.snakes) if snake.alive] == survivors
+    assert (game._occupancy == _count_segments(game)).all()
+
+
+def test_benchmark_runs():
+    result = benchmark.run(size=20, n_snakes=4, ticks=20)
+
+    assert result["ticks"] == 20
+    assert result["update_tps"] > 0
+
+
+def test_grid_is_only_redrawn_where_it_changed():
+    random.seed(3)
+
+    class Config(FreeForAllConfig):
+        grid_width = 20
+        grid_height = 20
+        grid_encoding = "ROWS"
+
+    for _ in range(10):
+        game = Game(config=Config)
+        for i in range(8):
+            game.register_agent(Seat(f"agent_{i}"))
+
+        while not game.finished:
+            grid = game.state["grid"]
+            assert game.state["grid"] is grid
+
+            redrawn = game.clone()
+            redrawn._grid_redraw = True
+            redrawn._grid_state_cache = None
+            assert redrawn.state["grid"] == grid
+
+            game.update(
+                [
+                    {"agent_id": agent_id, "move": random.choice(["up", "right"])}
+                    for agent_id in game.agent_ids
+                ]
+            )
+
+
+def test_run_length_grid():
+    assert _run_length_encode(b"   C>>@ ") == "3 C2>@ "
+    assert _run_length_encode(b"@") == "@"
+
+    class Config(FreeForAllConfig):
+        grid_width = 40
+        grid_height = 40
+
+    game = Game(config=Config)
+    grid = game.state["grid"]
+
+    assert grid["encoding"] == "RLE"
+    assert len(grid["grid_string"]) == 40
+    assert all(len(row) < 40 for row in grid["grid_string"])
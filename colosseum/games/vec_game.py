@@ -0,0 +1,114 @@
+import numpy as np
+
+
+class Seat:
+    """
+    Stands in for an agent when games are stepped directly, or played by a
+    Manager, without an agent process behind it.
+    """
+
+    def __init__(self, id):
+        self.id = id
+        self.tainted = False
+        self.tainted_reason = None
+        self.state_mode = "FULL"
+        self.state_exclude = frozenset()
+
+
+class VecGame:
+    """
+    Steps ``n_games`` independent games in lockstep. ``make_game`` is called
+    with no arguments to build each game (a game class works), and every game
+    is played by the same ``agent_ids``. Games that finish are replaced by a
+    fresh one within the ``step`` that finished them, so no step ever returns
+    the state a game ended in.
+
+    If ``observe`` is given it is called with each game state and the results
+    are stacked into a single array, otherwise the state dicts are returned.
+    """
+
+    def __init__(self, make_game, n_games, agent_ids, observe=None):
+        self._make_game = make_game
+        self._observe = observe
+        self.agent_ids = list(agent_ids)
+
+        self.games = [self._new_game() for _ in range(n_games)]
+        self.epochs = np.zeros(n_games, dtype=int)
+        self.episodes = np.zeros(n_games, dtype=int)
+
+    def __len__(self):
+        return len(self.games)
+
+    def reset(self):
+        self.games = [self._new_game() for _ in self.games]
+        self.epochs[:] = 0
+        return self.states()
+
+    def states(self):
+        states = [game.state for game in self.games]
+
+        if self._observe:
+            return np.stack([self._observe(state) for state in states])
+
+        return states
+
+    def scores(self):
+        """
+        Returns an array with one row per game and one column per agent, in
+        the same order as ``agent_ids``.
+        """
+        scores = np.zeros((len(self.games), len(self.agent_ids)))
+
+        for i, game in enumerate(self.games):
+            game_scores = game.scores
+            for j, agent_id in enumerate(self.agent_ids):
+                scores[i, j] = game_scores.get(agent_id, 0)
+
+        return scores
+
+    def finished(self):
+        return np.array([game.finished for game in self.games], dtype=bool)
+
+    def step(self, actions_batch):
+        """
+        Updates every game with its entry in ``actions_batch``, which is either
+        the list of agent actions taken by the game's ``update``, or a dict
+        mapping agent ids to their actions (``agent_id`` gets filled in).
+
+        Returns the new states, the scores and which games finished. Scores
+        and the finished flags refer to the games before they get reset, while
+        the states of finished games are already from the fresh ones.
+        """
+        if len(actions_batch) != len(self.games):
+            raise ValueError(
+                f"expected actions for {len(self.games)} games, got {len(actions_batch)}"
+            )
+
+        for game, agent_actions in zip(self.games, actions_batch):
+            if isinstance(agent_actions, dict):
+                agent_actions = [
+                    {**actions, "agent_id": agent_id}
+                    for agent_id, actions in agent_actions.items()
+                ]
+
+            game.update(agent_actions)
+
+        self.epochs += 1
+
+        scores = self.scores()
+        finished = self.finished()
+
+        for i in np.flatnonzero(finished):
+            self.games[i] = self._new_game()
+            self.epochs[i] = 0
+            self.episodes[i] += 1
+
+        return self.states(), scores, finished
+
+    def _new_game(self):
+        game = self._make_game()
+
+        for agent_id in self.agent_ids:
+            game.register_agent(Seat(agent_id))
+
+        return game
@@ -0,0 +1,60 @@
+import math
+
+import numpy as np
+
+
+def position_of(obj):
+    """
+    Position of an entity, a state dict, or the position itself if ``obj`` is
+    already one (e.g. an ``(x, y)`` tuple).
+    """
+    if isinstance(obj, dict):
+        return obj["position"]
+
+    return getattr(obj, "position", obj)
+
+
+def distance(a, b):
+    ax, ay = position_of(a)
+    bx, by = position_of(b)
+
+    return math.hypot(ax - bx, ay - by)
+
+
+def move_towards(position, target, max_distance):
+    """
+    Returns ``position`` moved towards ``target`` by at most ``max_distance``.
+    Positions closer than 1e-4 to their target are returned as is.
+    """
+    x, y = position
+    dx = target[0] - x
+    dy = target[1] - y
+
+    distance_to_target = math.hypot(dx, dy)
+    distance_to_move = min(max_distance, distance_to_target)
+
+    if distance_to_move <= 1e-4:
+        return position
+
+    return (
+        x + dx / distance_to_target * distance_to_move,
+        y + dy / distance_to_target * distance_to_move,
+    )
+
+
+def pairwise_distances(positions_a, positions_b):
+    """
+    Distances between each row of ``positions_a`` and the matching row of
+    ``positions_b``, both arrays of shape (n, 2). Either one can also be a
+    single position, to get the distances of every row to it.
+    """
+    delta = np.asarray(positions_a, dtype=float) - np.asarray(positions_b, dtype=float)
+    return np.hypot(delta[..., 0], delta[..., 1])
+
+
+def within_radius(positions, center, radius):
+    """
+    Boolean mask of the rows in ``positions`` at most ``radius`` away from
+    ``center``.
+    """
+    return pairwise_distances(positions, center) <= radius
@@ -0,0 +1,147 @@
+import atexit
+import logging
+import logging.handlers
+import queue
+from collections import defaultdict
+
+
+# Pass as ``extra=PER_TICK`` to log calls that happen on every tick, so that
+# they can be sampled with ``--log-sample-every``
+PER_TICK = {"per_tick": True}
+
+_listener = None
+
+
+class TickSampler(logging.Filter):
+    """
+    Lets only one in every ``every`` records flagged as per tick through.
+    Records are counted by logger and message template, so each kind of per
+    tick event is sampled independently. Other records are never filtered.
+    """
+
+    def __init__(self, every=1):
+        super().__init__()
+        self.every = max(1, every)
+        self._counters = defaultdict(int)
+
+    def filter(self, record):
+        if self.every == 1 or not getattr(record, "per_tick", False):
+            return True
+
+        key = (record.name, record.msg)
+        count = self._counters[key]
+        self._counters[key] = count + 1
+
+        return count % self.every == 0
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        # The stock handler formats the message in the calling thread, which
+        # is exactly the cost we are trying to move out of the hot loops.  The
+        # record is handed over as is and formatted by the listener thread.
+        # This relies on log arguments not being mutated after the call.
+        return record
+
+
+def setup_logging(
+    filename=None, level=logging.INFO, module_levels=None, sample_every=1
+):
+    """
+    Configures the root logger to hand records over to a queue, which gets
+    drained by a background thread that does the formatting and writing.
+    Records go to ``filename`` if given or to stderr otherwise.
+    ``module_levels`` maps logger names (e.g. ``colosseum.games.snake``) to
+    levels and overrides ``level`` for them.
+    """
+    global _listener
+
+    if _listener:
+        _listener.stop()
+
+    if filename:
+        handler = logging.FileHandler(filename)
+    else:
+        handler = logging.StreamHandler()
+
+    handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = _QueueHandler(log_queue)
+    queue_handler.addFilter(TickSampler(sample_every))
+
+    root = logging.getLogger()
+    for old_handler in root.handlers[:]:
+        root.removeHandler(old_handler)
+
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    for name, module_level in (module_levels or {}).items():
+        logging.getLogger(name).setLevel(module_level)
+
+    _listener = logging.handlers.QueueListener(log_queue, handler)
+    _listener.start()
+
+    return _listener
+
+
+def stop_logging():
+    """
+    Flushes all pending records and stops the background writer.
+    """
+    global _listener
+
+    if _listener:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
+
+
+def add_logging_arguments(parser):
+    parser.add_argument(
+        "--log-level",
+        default="INFO",
+        type=str.upper,
+        help="Log level used for everything without a more specific level. Default is INFO",
+    )
+    parser.add_argument(
+        "--log-module-level",
+        action="append",
+        default=[],
+        metavar="MODULE=LEVEL",
+        help="Sets the log level of a single module, e.g. colosseum.games.food_catcher=WARNING. Can be given multiple times",
+    )
+    parser.add_argument(
+        "--log-sample-every",
+        default=1,
+        type=int,
+        metavar="N",
+        help="Only log one in every N occurrences of per tick events. Default is 1",
+    )
+
+
+def setup_logging_from_args(args, filename=None):
+    """
+    Sets up logging from the arguments added by ``add_logging_arguments``.
+    ``args`` can be either a namespace or a dict.
+    """
+    if not isinstance(args, dict):
+        args = vars(args)
+
+    module_levels = {}
+    for module_level in args["log_module_level"]:
+        name, _, level = module_level.partition("=")
+        if not name or not level:
+            raise ValueError(f"{module_level} is not in the MODULE=LEVEL format")
+
+        module_levels[name] = level.upper()
+
+    return setup_logging(
+        filename=filename,
+        level=args["log_level"],
+        module_levels=module_levels,
+        sample_every=args["log_sample_every"],
+    )
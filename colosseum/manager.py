@@ -1,10 +1,17 @@
-import json
+import itertools
 import logging
 import string
+import threading
 from datetime import datetime
 from random import choices
 
-from .agent import Agent
+from .agent import create_agent
+from .logs import PER_TICK
+from .replay import get_replay_writer
+from .utils import encode_message
+
+
+logger = logging.getLogger(__name__)
 
 
 # TODO: ``world'' should be ``game''
@@ -13,6 +20,9 @@ class Manager:
         self.world = world
         self._replay_enable = True
         self._replay_filename = None
+        # Games can pick a more compact replay format than json lines, like
+        # PGN for chess
+        self._replay_writer_class = get_replay_writer(world.config.get("replay_format"))
         self._tick = 1
         self._stop = False
 
@@ -22,10 +32,17 @@ class Manager:
             self.agents = agents
         else:
             self.agents = [
-                Agent(agent_path, time_config=world.initial_config)
+                create_agent(agent_path, time_config=world.initial_config)
                 for agent_path in agent_paths
             ]
 
+        self._replay_writer = self._replay_writer_class(
+            self._replay_filename, world, self.agents
+        )
+        world.full_state_needed = (
+            self._replay_enable and self._replay_writer.needs_world_state
+        )
+
     def _set_replay_file(self):
         if not self._replay_enable:
             return
@@ -38,7 +55,8 @@ class Manager:
         )
         game_name = self.world.initial_config.game_name
         random_part = "_".join([now.strftime("%y%m%d_%H%M%S"), random_string])
-        self._replay_filename = f"replay_{game_name}_{random_part}.jsonl"
+        extension = self._replay_writer_class.extension
+        self._replay_filename = f"replay_{game_name}_{random_part}.{extension}"
 
     def start(self):
         for agent in self.agents:
@@ -48,16 +66,20 @@ class Manager:
             agent.set_config(self.world.config)
 
         self._check_for_tainted_agents()
-        logging.info("started")
+        logger.info("started")
 
     def ping(self):
         for agent in self.agents:
             agent.ping()
 
         self._check_for_tainted_agents()
-        logging.info("ping completed")
+        logger.info("ping completed")
 
     def loop(self):
+        if self.world.supports_pipelines:
+            self._loop_pipelines()
+            return
+
         while not self.world.finished:
             self.tick()
             if self._check_for_tainted_agents():
@@ -79,33 +101,71 @@ class Manager:
                 f"{self.world.config['update_mode']} is not a valid update mode"
             )
 
-        logging.info(f"tick {self._tick}")
+        logger.info("tick %s", self._tick, extra=PER_TICK)
         self._tick += 1
 
     def _tick_alternating(self):
         world_state = self.world.state
-        world_state["epoch"] = self._tick
-        world_state["agent_ids"] = [agent.id for agent in self.agents]
-
         agent_to_update = self._get_agent(self.world.agent_to_move)
-        agent_to_update.update_state(world_state)
+
+        encoded_state = self._update_agents([agent_to_update], world_state)
 
         agent_actions = [agent_to_update.get_actions()]
-        self._save_replay(world_state, agent_actions)
+        self._save_replay(world_state, agent_actions, encoded_state=encoded_state)
         self.world.update(agent_actions)
 
     def _tick_simultaneous(self):
         world_state = self.world.state
-        world_state["epoch"] = self._tick
-        world_state["agent_ids"] = [agent.id for agent in self.agents]
+        # Only left when the game took them out and plays on without them
+        agents = [agent for agent in self.agents if not agent.tainted]
 
-        for agent in self.agents:
-            agent.update_state(world_state)
+        encoded_state = self._update_agents(agents, world_state)
 
-        agent_actions = [agent.get_actions() for agent in self.agents]
-        self._save_replay(world_state, agent_actions)
+        agent_actions = [agent.get_actions() for agent in agents]
+        self._save_replay(world_state, agent_actions, encoded_state=encoded_state)
         self.world.update(agent_actions)
 
+    def _update_agents(self, agents, world_state):
+        """
+        Sends the world state to ``agents`` and returns it encoded, if it was
+        encoded for them, so the replay can reuse it. Games can give each agent
+        its own view of the world in ``state_by_agent``, which is sent instead
+        and left out of the replay. Agents can also leave keys out of their
+        state through their manifest.
+        """
+        base_state = {
+            "epoch": self._tick,
+            "agent_ids": [agent.id for agent in self.agents],
+        }
+        agent_states = world_state.pop("state_by_agent", None)
+
+        world_state.update(base_state)
+
+        # Without per agent views the state is the same for everyone, so it
+        # gets encoded only once for each set of excluded keys and the same
+        # bytes are sent to every agent asking for it
+        shared_states = {}
+
+        for agent in agents:
+            exclude = agent.state_exclude
+
+            if agent_states is not None:
+                state = {**agent_states[agent.id], **base_state}
+                agent.update_state(_exclude_keys(state, exclude))
+                continue
+
+            if exclude not in shared_states:
+                state = _exclude_keys(world_state, exclude)
+                shared_states[exclude] = (state, encode_message(state))
+
+            state, encoded = shared_states[exclude]
+            agent.update_state(state, encoded_state=encoded)
+
+        # Otherwise it's up to the replay writer to encode it, if it keeps it
+        _, encoded_state = shared_states.get(frozenset(), (None, None))
+
+        return encoded_state
+
     def _tick_isolated(self):
         world_state = self.world.state
         base_state = {}
@@ -122,11 +182,71 @@ class Manager:
         self._save_replay(world_state, agent_actions)
         self.world.update(agent_actions)
 
+    def _loop_pipelines(self):
+        """
+        Plays every agent and its own game on a thread of its own, so that
+        agents don't wait on one another. Threads are enough since agents
+        run in processes of their own, and all the time goes to waiting on
+        them. Everything stops once any agent gets tainted. The replay is
+        written after all the pipelines finish.
+        """
+        stop = threading.Event()
+        errors = []
+        actions = {agent.id: [] for agent in self.agents}
+
+        threads = [
+            threading.Thread(
+                target=self._run_pipeline,
+                args=(agent, actions[agent.id], stop, errors),
+                name=f"pipeline_{agent.id}",
+            )
+            for agent in self.agents
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if errors:
+            raise errors[0]
+
+        for epoch_actions in itertools.zip_longest(*actions.values()):
+            agent_actions = [action for action in epoch_actions if action is not None]
+            self._save_replay({}, agent_actions)
+
+            logger.info("tick %s", self._tick, extra=PER_TICK)
+            self._tick += 1
+
+        self._check_for_tainted_agents()
+
+    def _run_pipeline(self, agent, actions, stop, errors):
+        agent_ids = [agent.id for agent in self.agents]
+        epoch = self._tick
+
+        try:
+            while not stop.is_set() and not self.world.agent_finished(agent.id):
+                base_state = {"epoch": epoch, "agent_ids": agent_ids}
+                agent.update_state({**base_state, **self.world.agent_state(agent.id)})
+
+                agent_action = agent.get_actions()
+                actions.append(agent_action)
+                self.world.update_agent(agent.id, agent_action)
+                epoch += 1
+
+                if agent.tainted:
+                    stop.set()
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+
     def stop(self):
         for agent in self.agents:
             agent.stop()
 
-        logging.info("stopped")
+        if self._replay_enable:
+            self._replay_writer.close()
+
+        logger.info("stopped")
 
     @property
     def results(self):
@@ -173,25 +293,26 @@ class Manager:
         if not self.has_tainted_agent:
             return False
 
+        if self.world.drop_tainted_agents():
+            return False
+
         self._stop = True
         return True
 
-    def _save_replay(self, world_state, agent_actions):
+    def _save_replay(self, world_state, agent_actions, encoded_state=None):
         if not self._replay_enable:
             return
 
-        data = {
-            "game_config": self.world.config,
-            "epoch": self._tick,
-            "max_epoch": self.world.config["n_epochs"],
-            "world_state": world_state,
-            "agent_actions": agent_actions,
-            "agent_ids": [agent.id for agent in self.agents],
-        }
-
-        with open(self._replay_filename, "at") as f:
-            f.write(json.dumps(data))
-            f.write("\n")
+        self._replay_writer.write(
+            self._tick, world_state, agent_actions, encoded_state=encoded_state
+        )
 
     def _get_agent(self, id):
         return next((agent for agent in self.agents if agent.id == id), None)
+
+
+def _exclude_keys(state, exclude):
+    if not exclude:
+        return state
+
+    return {key: value for key, value in state.items() if key not in exclude}
@@ -3,7 +3,11 @@ from colosseum.manager import Manager
 
 def run_match(world, **kwargs):
     manager = Manager(world, **kwargs)
-    manager.start()
-    manager.loop()
-    manager.stop()
+    try:
+        manager.start()
+        manager.loop()
+    finally:
+        # Also when something breaks mid game, so that agents get stopped and
+        # the replay of what was played so far gets written
+        manager.stop()
     return manager.results
@@ -0,0 +1,48 @@
+from .games.chess.replay import PgnReplayWriter
+from .utils import encode_message
+
+
+class JsonlReplayWriter:
+    """
+    Writes a json line per tick, with the world state and the agent actions.
+    This is what the renderer reads, and what every game uses by default.
+    """
+
+    extension = "jsonl"
+    needs_world_state = True
+
+    def __init__(self, filename, world, agents):
+        self.filename = filename
+        self._world = world
+        self._agent_ids = [agent.id for agent in agents]
+
+    def write(self, epoch, world_state, agent_actions, encoded_state=None):
+        if encoded_state is None:
+            encoded_state = encode_message(world_state)
+
+        data = {
+            "game_config": self._world.config,
+            "epoch": epoch,
+            "max_epoch": self._world.config["n_epochs"],
+            "agent_actions": agent_actions,
+            "agent_ids": self._agent_ids,
+        }
+
+        # The world state is usually the largest thing in the line, so instead
+        # of encoding it again we splice the already encoded bytes in
+        line = b"".join(
+            [encode_message(data)[:-1], b', "world_state": ', encoded_state, b"}\n"]
+        )
+
+        with open(self.filename, "ab") as f:
+            f.write(line)
+
+    def close(self):
+        pass
+
+
+REPLAY_WRITERS = {"JSONL": JsonlReplayWriter, "PGN": PgnReplayWriter}
+
+
+def get_replay_writer(replay_format):
+    return REPLAY_WRITERS[replay_format or "JSONL"]
@@ -0,0 +1,155 @@
+import json
+import os
+import sys
+
+from ..agent import Agent, InProcessAgent, create_agent, is_import_path
+from ..games.chess.game import Game as ChessGame
+from ..games.food_catcher.config import Config as FoodCatcherConfig
+from ..games.food_catcher.game import World
+from ..match import run_match
+
+
+class ShortConfig(FoodCatcherConfig):
+    n_epochs = 5
+
+
+class GreedyBot:
+    name = "greedy"
+    version = "1.0"
+
+    def __init__(self):
+        self.agent_id = None
+        self.config = None
+        self.stop_reason = None
+
+    def set_config(self, config):
+        self.config = config
+
+    def step(self, state):
+        food = state["foods"][0]
+        return [
+            {"action": "move", "actor_id": actor["id"], "target": food["position"]}
+            for actor in state["actors"]
+            if actor["owner_id"] in state["agent_ids"]
+        ]
+
+    def stop(self, reason):
+        self.stop_reason = reason
+
+
+UCI_ENGINE = """
+import random
+import sys
+
+import chess
+
+random.seed(0)
+board = chess.Board()
+for line in sys.stdin:
+    command, *args = line.split()
+    if command == "uci":
+        print("id name Stand-in")
+        print("uciok")
+    elif command == "isready":
+        print("readyok")
+    elif command == "position":
+        board = chess.Board()
+        for move in args[2:]:
+            board.push_uci(move)
+    elif command == "go":
+        move = random.choice(list(board.legal_moves))
+        print(f"info depth 1 pv {move}")
+        print(f"bestmove {move}")
+    elif command == "quit":
+        break
+    sys.stdout.flush()
+"""
+
+
+def _make_uci_engine(folder):
+    folder.mkdir()
+    engine_path = folder / "engine"
+    engine_path.write_text(f"#!{sys.executable}\n{UCI_ENGINE}")
+    os.chmod(engine_path, 0o755)
+    (folder / "manifest.json").write_text(json.dumps({"channel": "UCI"}))
+
+    return str(engine_path)
+
+
+class BrokenBot:
+    def step(self, state):
+        raise RuntimeError("oops")
+
+
+def test_is_import_path():
+    assert is_import_path("colosseum.tests.test_agent:GreedyBot")
+    assert is_import_path("bots:Bot")
+    assert not is_import_path("agents/foo/agent.py")
+    assert not is_import_path("colosseum.tests.test_agent")
+
+
+def test_create_agent():
+    agent = create_agent(
+        "colosseum.tests.test_agent:GreedyBot", time_config=ShortConfig
+    )
+    assert isinstance(agent, InProcessAgent)
+
+    agent = create_agent("agents/foo/agent.py", time_config=ShortConfig)
+    assert type(agent) is Agent
+
+
+def test_in_process_match(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    results = run_match(
+        World(config=ShortConfig),
+        agent_paths=[
+            "colosseum.tests.test_agent:GreedyBot",
+            "colosseum.tests.test_agent:GreedyBot",
+        ],
+    )
+
+    assert not results["has_tainted_agent"]
+    assert [score["name"] for score in results["scores"]] == ["greedy", "greedy"]
+    assert [score["version"] for score in results["scores"]] == ["1.0", "1.0"]
+
+
+def test_in_process_agent_errors_are_counted():
+    agent = InProcessAgent(
+        "colosseum.tests.test_agent:BrokenBot", time_config=ShortConfig
+    )
+    agent.start()
+    agent.ping()
+    agent.set_config({})
+
+    agent.update_state({"foods": []})
+
+    assert agent.get_actions() == {}
+    assert agent.error_count == 1
+    assert not agent.tainted
+
+
+def test_in_process_agent_failing_to_load_is_tainted():
+    agent = InProcessAgent(
+        "colosseum.tests.test_agent:MissingBot", time_config=ShortConfig
+    )
+    agent.start()
+
+    assert agent.tainted
+    assert agent.tainted_reason == "STARTUP_FAIL"
+
+
+def test_uci_match(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    results = run_match(
+        ChessGame(),
+        agent_paths=[
+            _make_uci_engine(tmp_path / "white"),
+            _make_uci_engine(tmp_path / "black"),
+        ],
+    )
+
+    assert not results["has_tainted_agent"]
+    assert results["outcome"]["termination"] != "TAINTED"
+    assert [score["name"] for score in results["scores"]] == ["Stand-in"] * 2
@@ -0,0 +1,52 @@
+import math
+
+import numpy as np
+import pytest
+
+from ..geometry import (
+    distance,
+    move_towards,
+    pairwise_distances,
+    position_of,
+    within_radius,
+)
+
+
+class Entity:
+    def __init__(self, position):
+        self.position = position
+
+
+def test_position_of():
+    assert position_of((1, 2)) == (1, 2)
+    assert position_of([1, 2]) == [1, 2]
+    assert position_of({"position": (1, 2)}) == (1, 2)
+    assert position_of(Entity((1, 2))) == (1, 2)
+
+
+def test_distance_takes_any_mix_of_positions():
+    for a in [(0, 0), {"position": [0, 0]}, Entity((0, 0))]:
+        for b in [(3, 4), {"position": [3, 4]}, Entity((3, 4))]:
+            assert distance(a, b) == 5
+
+
+def test_move_towards():
+    assert move_towards((0, 0), (3, 4), 1) == pytest.approx((0.6, 0.8))
+    assert move_towards((0, 0), (0.5, 0), 1) == (0.5, 0)
+
+    position = (1, 1)
+    assert move_towards(position, (1, 1.00001), 1) is position
+
+
+def test_pairwise_distances():
+    a = np.array([[0, 0], [1, 1], [2, 2]])
+    b = np.array([[3, 4], [1, 1], [2, 3]])
+
+    assert pairwise_distances(a, b).tolist() == [5, 0, 1]
+    assert pairwise_distances(a, (0, 0)).tolist() == [0, math.sqrt(2), math.sqrt(8)]
+
+
+def test_within_radius():
+    positions = np.array([[0, 0], [1, 0], [3, 0]])
+
+    assert within_radius(positions, (0, 0), 1).tolist() == [True, True, False]
@@ -0,0 +1,31 @@
+import logging
+
+from ..logs import PER_TICK, TickSampler
+
+
+def _record(msg, **extra):
+    record = logging.LogRecord("foo", logging.INFO, __file__, 1, msg, (), None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_tick_sampler_samples_per_tick_records():
+    sampler = TickSampler(every=3)
+
+    passed = [sampler.filter(_record("tick %s", **PER_TICK)) for _ in range(7)]
+
+    assert passed == [True, False, False, True, False, False, True]
+
+
+def test_tick_sampler_counts_each_message_separately():
+    sampler = TickSampler(every=2)
+
+    assert sampler.filter(_record("tick %s", **PER_TICK))
+    assert sampler.filter(_record("actor %s moved", **PER_TICK))
+    assert not sampler.filter(_record("tick %s", **PER_TICK))
+
+
+def test_tick_sampler_ignores_regular_records():
+    sampler = TickSampler(every=100)
+
+    assert all(sampler.filter(_record("started")) for _ in range(5))
@@ -0,0 +1,207 @@
+import json
+import threading
+
+from ..agent import InProcessAgent
+from ..games.cherry_picker.config import Config as CherryPickerConfig
+from ..games.cherry_picker.game import Game as CherryPickerGame
+from ..games.chess.game import Game as ChessGame
+from ..games.food_catcher.config import FogOfWarConfig
+from ..games.food_catcher.game import World
+from ..games.snake.config import FreeForAllConfig as SnakeFreeForAllConfig
+from ..games.snake.game import Game as SnakeGame
+from ..games.vec_game import Seat
+from ..manager import Manager
+from ..utils import encode_message
+
+
+def test_save_replay_with_encoded_state(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    manager = Manager(World(), agents=[Seat("foo"), Seat("bar")])
+    world_state = {"foods": [{"position": [1, 2], "quantity": 3}], "epoch": 1}
+    agent_actions = [{"agent_id": "foo", "actions": []}]
+
+    manager._save_replay(world_state, agent_actions)
+    manager._save_replay(
+        world_state, agent_actions, encoded_state=encode_message(world_state)
+    )
+
+    with open(manager._replay_filename) as f:
+        lines = [json.loads(line) for line in f]
+
+    assert len(lines) == 2
+    assert lines[0] == lines[1]
+    assert lines[0]["world_state"] == world_state
+    assert lines[0]["agent_actions"] == agent_actions
+    assert lines[0]["agent_ids"] == ["foo", "bar"]
+
+
+class RecordingAgent(Seat):
+    def __init__(self, id):
+        super().__init__(id)
+        self.states = []
+
+    def update_state(self, state, encoded_state=None):
+        self.states.append(state)
+
+    def get_actions(self):
+        return {"agent_id": self.id, "actions": []}
+
+
+def test_agents_get_their_own_view(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    class Config(FogOfWarConfig):
+        grid_width = 40
+        grid_height = 40
+
+    agents = [RecordingAgent("foo"), RecordingAgent("bar")]
+    world = World(config=Config)
+    for agent in agents:
+        world.register_agent(agent)
+
+    manager = Manager(world, agents=agents)
+    manager.tick()
+
+    for agent in agents:
+        (state,) = agent.states
+        assert state["epoch"] == 1
+        assert [base["owner_id"] for base in state["bases"]] == [agent.id]
+
+    with open(manager._replay_filename) as f:
+        (line,) = [json.loads(line) for line in f]
+
+    assert "state_by_agent" not in line["world_state"]
+    assert len(line["world_state"]["bases"]) == 2
+
+
+def test_agents_can_leave_keys_out(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    agents = [RecordingAgent("foo"), RecordingAgent("bar")]
+    agents[1].state_exclude = frozenset(["grid"])
+
+    game = SnakeGame()
+    for agent in agents:
+        game.register_agent(agent)
+
+    manager = Manager(game, agents=agents)
+    manager.tick()
+
+    assert "grid" in agents[0].states[0]
+    assert "grid" not in agents[1].states[0]
+    assert agents[1].states[0]["snakes"] == agents[0].states[0]["snakes"]
+
+    with open(manager._replay_filename) as f:
+        (line,) = [json.loads(line) for line in f]
+
+    assert "grid" in line["world_state"]
+
+
+def test_free_for_all_plays_on_without_tainted_agents(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    class Config(SnakeFreeForAllConfig):
+        n_epochs = 5
+
+    agents = [RecordingAgent(f"agent_{i}") for i in range(4)]
+    game = SnakeGame(config=Config)
+    for agent in agents:
+        game.register_agent(agent)
+
+    manager = Manager(game, agents=agents)
+    manager.tick()
+    agents[0].tainted = True
+    manager.loop()
+
+    assert game.finished
+    assert game.snakes_by_id["agent_0"].dead
+    assert len(agents[0].states) == 1
+    assert [len(agent.states) for agent in agents[1:]] == [Config.n_epochs] * 3
+
+
+class ScriptedChessAgent(RecordingAgent):
+    clock = None
+    last_step_duration = None
+
+    def __init__(self, id, moves):
+        super().__init__(id)
+        self.state_mode = "INCREMENTAL"
+        self.moves = iter(moves)
+
+    def get_actions(self):
+        return {"agent_id": self.id, "move": next(self.moves)}
+
+
+def test_incremental_agents_skip_the_full_state(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    encoded = []
+    monkeypatch.setattr(
+        "colosseum.manager.encode_message",
+        lambda message: encoded.append(message) or encode_message(message),
+    )
+
+    agents = [
+        ScriptedChessAgent("foo", ["e2e4", "g1f3"]),
+        ScriptedChessAgent("bar", ["e7e5", "b8c6"]),
+    ]
+    game = ChessGame()
+    for agent in agents:
+        game.register_agent(agent)
+    game.agent_color = {"foo": "WHITE", "bar": "BLACK"}
+    game.agent_by_color = {"WHITE": "foo", "BLACK": "bar"}
+
+    manager = Manager(game, agents=agents)
+    for _ in range(4):
+        manager.tick()
+
+    # Only the first position is sent in full, and the PGN replay doesn't
+    # need the world state encoded
+    assert "fen" in agents[0].states[0]
+    assert "fen" not in agents[0].states[1]
+    assert "fen" not in game._ply_cache
+    assert encoded == []
+
+
+class ThreadRecordingBot:
+    threads = set()
+
+    def step(self, state):
+        self.threads.add(threading.current_thread().name)
+        return []
+
+
+def test_isolated_agents_play_on_their_own_threads(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    class Config(CherryPickerConfig):
+        n_epochs = 5
+
+    agents = [
+        InProcessAgent(
+            "colosseum.tests.test_manager:ThreadRecordingBot",
+            id=agent_id,
+            time_config=Config,
+        )
+        for agent_id in ["foo", "bar"]
+    ]
+    game = CherryPickerGame(config=Config)
+
+    manager = Manager(game, agents=agents)
+    manager.start()
+    manager.loop()
+    manager.stop()
+
+    assert game.finished
+    assert ThreadRecordingBot.threads == {"pipeline_foo", "pipeline_bar"}
+    assert set(manager.scores[0]) >= {"agent_id", "score"}
+
+    with open(manager._replay_filename) as f:
+        lines = [json.loads(line) for line in f]
+
+    assert [line["epoch"] for line in lines] == [1, 2, 3, 4, 5]
+    assert all(
+        {action["agent_id"] for action in line["agent_actions"]} == {"foo", "bar"}
+        for line in lines
+    )
@@ -0,0 +1,149 @@
+import json
+import pickle
+import random
+
+import pytest
+
+from ..games.cherry_picker.game import Game as CherryPickerGame
+from ..games.chess.game import Game as ChessGame
+from ..games.food_catcher.game import World
+from ..games.snake.game import Game as SnakeGame
+from ..games.vec_game import Seat
+
+
+def _food_catcher_actions(game, tick):
+    actions = []
+    for agent_id in sorted(game.agent_ids):
+        actors = [actor for actor in game.actors if actor.owner_id == agent_id]
+        actions.append(
+            {
+                "agent_id": agent_id,
+                "actions": [
+                    {"action": "move", "actor_id": actor.id, "target": (tick, tick)}
+                    for actor in actors
+                ],
+            }
+        )
+    return actions
+
+
+def _cherry_picker_actions(game, tick):
+    return [
+        _food_catcher_actions(world, tick)[0] for world in game.agent_worlds.values()
+    ]
+
+
+def _snake_actions(game, tick):
+    move = ["up", "right", "down", "left"][tick % 4]
+    return [{"agent_id": agent_id, "move": move} for agent_id in sorted(game.agent_ids)]
+
+
+def _chess_actions(game, tick):
+    move = sorted(str(move) for move in game._board.legal_moves)[0]
+    return [{"agent_id": game.agent_to_move, "move": move}]
+
+
+def _state(game):
+    return json.dumps(game.state, sort_keys=True, default=str)
+
+
+def _play(game, make_actions, ticks):
+    states = []
+    for tick in range(ticks):
+        if game.finished:
+            break
+        states.append(_state(game))
+        game.update(make_actions(game, tick))
+    states.append(_state(game))
+    return states
+
+
+@pytest.mark.parametrize(
+    "make_game, make_actions",
+    [
+        (World, _food_catcher_actions),
+        (CherryPickerGame, _cherry_picker_actions),
+        (SnakeGame, _snake_actions),
+        (ChessGame, _chess_actions),
+    ],
+)
+def test_restore_replays_the_same_game(make_game, make_actions):
+    random.seed(42)
+    game = make_game()
+    for agent_id in ["foo", "bar"]:
+        game.register_agent(Seat(agent_id))
+
+    _play(game, make_actions, 5)
+    snapshot = game.snapshot()
+
+    random.seed(1337)
+    expected = _play(game, make_actions, 10)
+
+    game.restore(snapshot)
+    random.seed(1337)
+    assert _play(game, make_actions, 10) == expected
+
+    # The snapshot can be restored more than once
+    game.restore(snapshot)
+    random.seed(1337)
+    assert _play(game, make_actions, 10) == expected
+
+
+@pytest.mark.parametrize("make_game", [World, CherryPickerGame, SnakeGame, ChessGame])
+def test_clone_is_independent(make_game):
+    random.seed(42)
+    game = make_game()
+    agents = [Seat("foo"), Seat("bar")]
+    for agent in agents:
+        game.register_agent(agent)
+
+    before = _state(game)
+    clone = game.clone()
+
+    assert _state(clone) == before
+    assert clone.agents == game.agents
+    assert clone.agents is not game.agents
+
+    make_actions = {
+        World: _food_catcher_actions,
+        CherryPickerGame: _cherry_picker_actions,
+        SnakeGame: _snake_actions,
+        ChessGame: _chess_actions,
+    }[make_game]
+    _play(clone, make_actions, 3)
+
+    assert _state(game) == before
+
+
+@pytest.mark.parametrize(
+    "make_game, make_actions",
+    [
+        (World, _food_catcher_actions),
+        (CherryPickerGame, _cherry_picker_actions),
+        (SnakeGame, _snake_actions),
+        (ChessGame, _chess_actions),
+    ],
+)
+def test_pickled_snapshot_resumes_with_other_agents(make_game, make_actions):
+    random.seed(42)
+    game = make_game()
+    for agent_id in ["foo", "bar"]:
+        game.register_agent(Seat(agent_id))
+
+    _play(game, make_actions, 5)
+    snapshot = pickle.dumps(game.snapshot())
+
+    random.seed(1337)
+    expected = _play(game, make_actions, 10)
+
+    # Like a worker resuming a checkpoint, with agents of its own
+    agents = [Seat("foo"), Seat("bar")]
+    resumed = make_game()
+    resumed.restore(pickle.loads(snapshot), agents=agents)
+
+    assert resumed.agents == set(agents)
+    random.seed(1337)
+    assert _play(resumed, make_actions, 10) == expected
+
+    with pytest.raises(ValueError):
+        resumed.restore(pickle.loads(snapshot), agents=[Seat("foo")])
@@ -0,0 +1,32 @@
+from ..tournament import INITIAL_ELO, Match, Participant
+
+
+def _result(scores):
+    return {
+        "scores": [
+            {"name": path, "agent_path": path, "score": score}
+            for path, score in scores.items()
+        ]
+    }
+
+
+def test_pairwise_match():
+    players = [Participant("a/agent.py"), Participant("b/agent.py")]
+    match = Match(*players)
+
+    match.set_results(_result({"a/agent.py": 3, "b/agent.py": 1}))
+
+    assert (players[0].wins, players[1].loses) == (1, 1)
+    assert players[0].elo > INITIAL_ELO > players[1].elo
+
+
+def test_multiplayer_match():
+    paths = ["a/agent.py", "b/agent.py", "c/agent.py", "d/agent.py"]
+    players = [Participant(path) for path in paths]
+    match = Match(*players)
+
+    match.set_results(_result(dict(zip(paths, [5, 5, 2, 0]))))
+
+    assert [player.score for player in players] == [0.5, 0.5, 0, 0]
+    assert [player.loses for player in players] == [0, 0, 1, 1]
+    assert players[0].elo == players[1].elo > players[2].elo > players[3].elo
@@ -0,0 +1,53 @@
+import numpy as np
+
+from ..games.food_catcher.config import Config as FoodCatcherConfig
+from ..games.food_catcher.game import World
+from ..games.snake.game import Game as SnakeGame
+from ..games.vec_game import VecGame
+
+
+class ShortConfig(FoodCatcherConfig):
+    n_epochs = 3
+
+
+def test_step_returns_batched_results():
+    vec_game = VecGame(lambda: World(config=ShortConfig), 4, ["foo", "bar"])
+
+    states = vec_game.states()
+    assert len(states) == 4
+    assert all(len(state["actors"]) == 2 for state in states)
+
+    states, scores, finished = vec_game.step([{"foo": {}, "bar": {}}] * 4)
+
+    assert len(states) == 4
+    assert scores.shape == (4, 2)
+    assert finished.dtype == bool
+    assert not finished.any()
+    assert (vec_game.epochs == 1).all()
+
+
+def test_finished_games_are_reset():
+    vec_game = VecGame(lambda: World(config=ShortConfig), 2, ["foo", "bar"])
+
+    for _ in range(2):
+        _, _, finished = vec_game.step([[], []])
+        assert not finished.any()
+
+    old_games = list(vec_game.games)
+    _, _, finished = vec_game.step([[], []])
+
+    assert finished.all()
+    assert (vec_game.epochs == 0).all()
+    assert (vec_game.episodes == 1).all()
+    assert all(new is not old for new, old in zip(vec_game.games, old_games))
+
+
+def test_observe_stacks_observations():
+    def observe(state):
+        return np.array([len(state["snakes"]), len(state["foods"])])
+
+    vec_game = VecGame(SnakeGame, 3, ["foo", "bar"], observe=observe)
+    observations = vec_game.states()
+
+    assert observations.shape == (3, 2)
+    assert (observations[:, 0] == 2).all()
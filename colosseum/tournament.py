@@ -2,11 +2,15 @@
 
 import itertools
 from collections import defaultdict
+from functools import partial
 from pathlib import Path
 
+from colosseum.agent import is_import_path
 from colosseum.games.cherry_picker.game import Game as cherry_picker_game
 from colosseum.games.chess.game import Game as chess_game
+from colosseum.games.food_catcher.config import FogOfWarConfig
 from colosseum.games.food_catcher.game import World as food_catcher_game
+from colosseum.games.snake.config import FreeForAllConfig as SnakeFreeForAllConfig
 from colosseum.games.snake.game import Game as snake_game
 from colosseum.simple_elo import compute_updated_ratings
 
@@ -20,12 +24,16 @@ def _get_game_by_name(game_name):
     match game_name.lower():
         case "food_catcher":
             return food_catcher_game
+        case "food_catcher_fog":
+            return partial(food_catcher_game, config=FogOfWarConfig)
         case "cherry_picker":
             return cherry_picker_game
         case "chess_game":
             return chess_game
         case "snake":
             return snake_game
+        case "snake_ffa":
+            return partial(snake_game, config=SnakeFreeForAllConfig)
 
 
 class TournamentResult:
@@ -67,30 +75,47 @@ class Match:
     def set_results(self, result):
         self._result = result["scores"]
 
-        if self.n_players != 2:
-            raise RuntimeError("only pairwise matches are supported at this point")
+        # With more than two players, whoever has the top score wins and
+        # everyone else loses. Players tied at the top draw.
+        top_score = self.rankings[0]["score"]
+        top_players = [
+            self._get_player_by_agent_path(ranking["agent_path"])
+            for ranking in self.rankings
+            if ranking["score"] == top_score
+        ]
 
-        if self.has_winner:
-            winner = self._get_player_by_agent_path(self.rankings[0]["agent_path"])
-            loser = self._get_player_by_agent_path(self.rankings[1]["agent_path"])
-            winner.win()
-            loser.lose()
-
-            self._update_elo(winner, loser, 1)
-
-        if self.is_draw:
-            for player in self._players:
+        for player in self._players:
+            if player not in top_players:
+                player.lose()
+            elif len(top_players) == 1:
+                player.win()
+            else:
                 player.draw()
 
-            self._update_elo(*self._players, 0.5)
+        self._update_elo()
+
+    def _update_elo(self):
+        # Multiplayer matches are rated as a pairwise match between every two
+        # players, based on their scores
+        players = [
+            self._get_player_by_agent_path(ranking["agent_path"])
+            for ranking in self.rankings
+        ]
+        scores = {ranking["agent_path"]: ranking["score"] for ranking in self.rankings}
+
+        elos = {player.pretty_name: player.elo for player in players}
+        match_results = {}
+        for player1, player2 in itertools.combinations(players, 2):
+            score1 = scores[player1.agent_path]
+            score2 = scores[player2.agent_path]
+            match_results[(player1.pretty_name, player2.pretty_name)] = (
+                1 if score1 > score2 else 0.5 if score1 == score2 else 0
+            )
 
-    def _update_elo(self, player1, player2, result):
-        elos = {player1.pretty_name: player1.elo, player2.pretty_name: player2.elo}
-        match_result = {(player1.pretty_name, player2.pretty_name): result}
-        updated_elos = compute_updated_ratings(elos, match_result)
+        updated_elos = compute_updated_ratings(elos, match_results)
 
-        player1._update_elo(updated_elos[player1.pretty_name])
-        player2._update_elo(updated_elos[player2.pretty_name])
+        for player in players:
+            player._update_elo(updated_elos[player.pretty_name])
 
     @property
     def n_players(self):
@@ -153,6 +178,9 @@ class Participant:
 
     @property
     def pretty_name(self):
+        if is_import_path(self.agent_path):
+            return self.agent_path
+
         return Path(self.agent_path).parent.name
 
 
@@ -179,7 +207,7 @@ def round_robin(game_name, participants, n_rounds=1, n_participants_per_round=2)
     return TournamentResult(participants, matches)
 
 
-def tournament(game, agent_paths, mode):
+def tournament(game, agent_paths, mode, players_per_match=2):
     mode = mode.upper()
     participants = [Participant(agent_path) for agent_path in agent_paths]
 
@@ -190,4 +218,9 @@ def tournament(game, agent_paths, mode):
     else:
         n_rounds = 1
 
-    return round_robin(game, participants, n_rounds=n_rounds)
+    return round_robin(
+        game,
+        participants,
+        n_rounds=n_rounds,
+        n_participants_per_round=players_per_match,
+    )
@@ -1,6 +1,5 @@
 import itertools
 import json
-import logging
 import lzma
 import os
 import random
@@ -18,9 +17,10 @@ from dotenv import load_dotenv
 
 from colosseum.games.cherry_picker.game import Game as CherryPickerGame
 from colosseum.games.chess.game import Game as ChessGame
+from colosseum.games.chess.replay import expand_pgn_replay
+from colosseum.games.food_catcher.config import FogOfWarConfig
 from colosseum.games.food_catcher.game import World as FoodCatcherGame
 from colosseum.games.snake.game import Game as SnakeGame
-from colosseum.utils import get_internal_id
 
 from .agent import Agent
 from .match import run_match
@@ -268,6 +268,8 @@ class MatchRunner:
 
         if game_name == "food_catcher":
             game = FoodCatcherGame()
+        elif game_name == "food_catcher_fog":
+            game = FoodCatcherGame(config=FogOfWarConfig)
         elif game_name == "cherry_picker":
             game = CherryPickerGame()
         elif game_name == "chess":
@@ -322,7 +324,13 @@ def upload_match_replay(match_id, replay_filename):
     print(f"uploading match replay {match_id} {replay_filename}")
 
     with open(replay_filename) as f:
-        data = lzma.compress(f.read().encode())
+        replay = f.read()
+
+    # The renderer reads json lines
+    if replay_filename.endswith(".pgn"):
+        data = lzma.compress(expand_pgn_replay(replay))
+    else:
+        data = lzma.compress(replay.encode())
 
     response = requests.post(
         API_URL + f"matches/{match_id}/upload_replay/",
@@ -392,7 +400,4 @@ def send_heartbeat():
 
 
 def online_tournament(**kwargs):
-    logging.basicConfig(
-        filename=f"online_tournament_{get_internal_id()}.log", level=logging.INFO
-    )
     MatchRunner.run_next_match(**kwargs)
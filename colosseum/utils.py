@@ -1,8 +1,9 @@
+import json
 import random
 import string
 from datetime import datetime
 
-import numpy as np
+from .geometry import distance
 
 
 def get_internal_id():
@@ -16,21 +17,15 @@ def get_internal_id():
     return "_".join([now.strftime("%y%m%d%H%M%S"), random_string])
 
 
+def encode_message(message):
+    return json.dumps(message).encode()
+
+
 def object_distance(a, b):
     assert a is not None
     assert b is not None
 
-    if hasattr(a, "position"):
-        a_pos = np.array(a.position)
-    else:
-        a_pos = np.array(a["position"])
-
-    if hasattr(b, "position"):
-        b_pos = np.array(b.position)
-    else:
-        b_pos = np.array(b["position"])
-
-    return np.linalg.norm(a_pos - b_pos)
+    return distance(a, b)
 
 
 def random_id():
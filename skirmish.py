@@ -2,13 +2,15 @@
 
 import argparse
 import json
-import logging
 import sys
 
 from colosseum.games.cherry_picker.game import Game as CherryPickerGame
 from colosseum.games.chess.game import Game as ChessGame
+from colosseum.games.food_catcher.config import FogOfWarConfig
 from colosseum.games.food_catcher.game import World
+from colosseum.games.snake.config import FreeForAllConfig as SnakeFreeForAllConfig
 from colosseum.games.snake.game import Game as SnakeGame
+from colosseum.logs import add_logging_arguments, setup_logging_from_args
 from colosseum.match import run_match
 from colosseum.utils import get_internal_id
 
@@ -18,21 +20,24 @@ parser = argparse.ArgumentParser(
 )
 parser.add_argument("--game", required=True, type=str)
 parser.add_argument("--agent", action="append", required=True, type=str)
+add_logging_arguments(parser)
 
 
-def main(game_name, agent_paths):
-    logging.basicConfig(
-        filename=f"skirmish_{get_internal_id()}.log", level=logging.INFO
-    )
+def main(game_name, agent_paths, logging_args):
+    setup_logging_from_args(logging_args, filename=f"skirmish_{get_internal_id()}.log")
 
     if game_name == "chess":
         game = ChessGame()
     elif game_name == "snake":
         game = SnakeGame()
+    elif game_name == "snake_ffa":
+        game = SnakeGame(config=SnakeFreeForAllConfig)
     elif game_name == "cherry_picker":
         game = CherryPickerGame()
     elif game_name == "food_catcher":
         game = World()
+    elif game_name == "food_catcher_fog":
+        game = World(config=FogOfWarConfig)
     else:
         raise ValueError(f"{game_name} is not a valid game")
 
@@ -43,4 +48,4 @@ def main(game_name, agent_paths):
 
 if __name__ == "__main__":
     config = vars(parser.parse_args())
-    main(game_name=config["game"], agent_paths=config["agent"])
+    main(game_name=config["game"], agent_paths=config["agent"], logging_args=config)
@@ -2,22 +2,24 @@
 
 import argparse
 
+from colosseum.logs import add_logging_arguments, setup_logging_from_args
 from colosseum.tournament import tournament
 
 
-def main(game, agent_paths, mode):
+def main(game, agent_paths, mode, players_per_match):
     if len(agent_paths) == 0:
         raise ValueError("No agents were provided")
 
     print(f"GAME: {game}")
     print(f"MODE: {mode}")
+    print(f"PLAYERS PER MATCH: {players_per_match}")
 
     print("agents:")
     for participant in agent_paths:
         print(f" -> {participant}")
     print()
 
-    result = tournament(game, agent_paths, mode)
+    result = tournament(game, agent_paths, mode, players_per_match=players_per_match)
 
     for ranking, participant in result.rankings.items():
         print(
@@ -39,7 +41,19 @@ if __name__ == "__main__":
         default="ROUND_ROBIN",
         help="Tournament mode. Options are ROUND_ROBIN, DOUBLE_ROUND_ROBIN and TRIPLE_ROUND_ROBIN. Default is ROUND_ROBIN",
     )
+    parser.add_argument(
+        "--players-per-match",
+        action="store",
+        type=int,
+        default=2,
+        help="How many agents play in each match, e.g. for snake_ffa. Default is 2",
+    )
+    add_logging_arguments(parser)
     parser.add_argument("agent_paths", nargs=argparse.REMAINDER)
     kwargs = vars(parser.parse_args())
 
+    setup_logging_from_args(kwargs)
+    for key in ["log_level", "log_module_level", "log_sample_every"]:
+        kwargs.pop(key)
+
     main(**kwargs)
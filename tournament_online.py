@@ -2,7 +2,9 @@
 
 import argparse
 
+from colosseum.logs import add_logging_arguments, setup_logging_from_args
 from colosseum.tournament_online import _push_metric, online_tournament
+from colosseum.utils import get_internal_id
 
 
 def _handle_exception(exception):
@@ -27,8 +29,15 @@ if __name__ == "__main__":
     parser.add_argument(
         "--game", action="store", help="Specify a particular game to be ran"
     )
+    add_logging_arguments(parser)
     kwargs = vars(parser.parse_args())
 
+    setup_logging_from_args(
+        kwargs, filename=f"online_tournament_{get_internal_id()}.log"
+    )
+    for key in ["log_level", "log_module_level", "log_sample_every"]:
+        kwargs.pop(key)
+
     loop = kwargs.pop("loop")
 
     if loop: